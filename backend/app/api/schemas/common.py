@@ -10,6 +10,7 @@ class HealthResponse(BaseModel):
     version: str = Field(..., description="API version")
     environment: str = Field(..., description="Environment")
     services: dict[str, bool] = Field(default_factory=dict, description="Status of dependent services")
+    caches: dict[str, dict[str, int]] = Field(default_factory=dict, description="In-process cache counters")
 
 
 class MessageResponse(BaseModel):
@@ -1,6 +1,9 @@
 """Endpoints for fund data retrieval and comparison."""
 
 import logging
+import os
+import pickle
+from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, Query
 
@@ -21,16 +24,60 @@ _loader: DataLoader | None = None
 _funds_cache: list | None = None
 
 
+def _snapshot_key(csv_path: Path) -> tuple[int, int] | None:
+    """CSV (mtime_ns, size) used to validate the parsed-funds snapshot."""
+    try:
+        stat = csv_path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_funds_snapshot(snapshot_path: Path, key: tuple[int, int]) -> list | None:
+    """Load funds pickled by a previous process if the CSV has not changed since."""
+    try:
+        with open(snapshot_path, "rb") as f:
+            stored_key, funds = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Failed to load funds snapshot %s: %s", snapshot_path, e)
+        return None
+    return funds if stored_key == key else None
+
+
+def _save_funds_snapshot(snapshot_path: Path, key: tuple[int, int], funds: list) -> None:
+    """Atomically pickle parsed funds next to the CSV for the next process start."""
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, funds), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except Exception as e:
+        logger.warning("Failed to save funds snapshot %s: %s", snapshot_path, e)
+        tmp_path.unlink(missing_ok=True)
+
+
 def get_funds():
-    """Get cached funds data, loading from CSV if not cached."""
+    """Get cached funds data, loading from the pickle snapshot or CSV if not cached."""
     global _loader, _funds_cache
     if _funds_cache is None:
-        _loader = DataLoader(
-            data_dir=settings.data_dir,
-            faqs_file=settings.faqs_file,
-            funds_file=settings.funds_file,
-        )
-        _funds_cache = _loader.load_funds()
+        csv_path = Path(settings.funds_path)
+        snapshot_path = csv_path.with_name(f"{csv_path.name}.pkl")
+        key = _snapshot_key(csv_path)
+        funds = _load_funds_snapshot(snapshot_path, key) if key else None
+        if funds is not None:
+            logger.info(f"Loaded {len(funds)} funds from snapshot {snapshot_path}")
+        else:
+            _loader = DataLoader(
+                data_dir=settings.data_dir,
+                faqs_file=settings.faqs_file,
+                funds_file=settings.funds_file,
+            )
+            funds = _loader.load_funds()
+            if key and funds:
+                _save_funds_snapshot(snapshot_path, key, funds)
+        _funds_cache = funds
         logger.info(f"Loaded {len(_funds_cache)} funds into cache")
     return _funds_cache
 
@@ -1,15 +1,23 @@
 """Health and readiness check endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 from app.api.schemas import HealthResponse
 from app.config import settings
+from app.db.repositories import get_embedding_memory_stats
 
 router = APIRouter(tags=["Health"])
 
 
+def is_pipeline_ready(request: Request) -> bool:
+    """Whether startup pipeline initialization has finished (ready if none was scheduled)."""
+    ready = getattr(request.app.state, "ready", None)
+    return ready is None or ready.is_set()
+
+
 @router.get("/health", response_model=HealthResponse)
-async def health_check() -> HealthResponse:
+async def health_check(request: Request) -> HealthResponse:
     """Health check endpoint returning API and service status."""
     services = {
         "api": True,
@@ -18,14 +26,17 @@ async def health_check() -> HealthResponse:
     }
     
     return HealthResponse(
-        status="healthy",
+        status="healthy" if is_pipeline_ready(request) else "warming",
         version=settings.app_version,
         environment=settings.environment,
         services=services,
+        caches={"embedding_cache": get_embedding_memory_stats()},
     )
 
 
 @router.get("/ready")
-async def readiness_check() -> dict:
-    """Readiness check endpoint for Kubernetes/Docker health probes."""
+async def readiness_check(request: Request) -> dict:
+    """Readiness check endpoint for Kubernetes/Docker health probes (503 while warming up)."""
+    if not is_pipeline_ready(request):
+        return JSONResponse(status_code=503, content={"ready": False, "status": "warming"})
     return {"ready": True}
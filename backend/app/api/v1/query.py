@@ -1,8 +1,9 @@
 """RAG query endpoints for natural language fund queries."""
 
 import logging
+import time
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 from app.api.schemas import (
     ErrorResponse,
@@ -10,21 +11,14 @@ from app.api.schemas import (
     QueryResponse,
     SearchMode,
 )
-from app.core.orchestration.pipeline import RAGPipeline
+from app.api.v1.health import is_pipeline_ready
+from app.config import settings
+from app.core.orchestration.pipeline import get_pipeline
+from app.db import QueryLog, get_query_log_writer
 
 router = APIRouter(tags=["Query"])
 logger = logging.getLogger(__name__)
 
-_pipeline: RAGPipeline | None = None
-
-
-def get_pipeline() -> RAGPipeline:
-    """Get or create the RAG pipeline instance."""
-    global _pipeline
-    if _pipeline is None:
-        _pipeline = RAGPipeline()
-    return _pipeline
-
 
 @router.post(
     "/query",
@@ -32,10 +26,13 @@ def get_pipeline() -> RAGPipeline:
     responses={
         400: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     },
 )
-async def query(request: QueryRequest) -> QueryResponse:
+async def query(request: QueryRequest, http_request: Request) -> QueryResponse:
     """Process a RAG query with retrieval and generation."""
+    if not is_pipeline_ready(http_request):
+        raise HTTPException(status_code=503, detail="RAG pipeline is warming up, retry shortly")
     try:
         logger.info(f"Processing query: {request.query[:50]}... | mode={request.search_mode}")
         
@@ -50,6 +47,19 @@ async def query(request: QueryRequest) -> QueryResponse:
         )
         
         logger.info(f"Query processed successfully | sources={len(response.sources)}")
+
+        if settings.query_log_enabled:
+            start_ns = getattr(http_request.state, "start_ns", None)
+            get_query_log_writer().enqueue(
+                QueryLog(
+                    query=request.query,
+                    search_mode=request.search_mode.value,
+                    query_type=response.query_type,
+                    response_time_ms=(time.perf_counter_ns() - start_ns) / 1e6 if start_ns else None,
+                    num_sources=len(response.sources),
+                    confidence=response.confidence,
+                )
+            )
         return response
         
     except ValueError as e:
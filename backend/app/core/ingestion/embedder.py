@@ -1,12 +1,17 @@
 """Generate embeddings using sentence-transformers with caching support."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from typing import Any
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Looks up the next chunk's cached embeddings while the current chunk is encoded
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-prefetch")
+
 
 class Embedder:
     """Embedding generator using sentence-transformers with caching and batch processing."""
@@ -17,9 +22,11 @@ class Embedder:
         device: str | None = None,
         batch_size: int = 32,
         use_cache: bool = True,
+        prefetch_chunk_size: int = 256,
     ):
         self.model_name = model_name
         self.batch_size = batch_size
+        self.prefetch_chunk_size = prefetch_chunk_size
         self.use_cache = use_cache
         self._model = None
         self._device = device
@@ -86,36 +93,57 @@ class Embedder:
             return np.array([])
 
         if self._cache and self.use_cache:
-            cached_results, uncached_indices = self._cache.get_batch(texts)
+            chunk_size = self.prefetch_chunk_size
+            chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            lookup = _PREFETCH_EXECUTOR.submit(self._cache.get_batch, chunks[0])
+            result = []
+            cache_hits = 0
+            for n, chunk in enumerate(chunks):
+                cached_results, uncached_indices = lookup.result()
+                if n + 1 < len(chunks):
+                    # Overlap the next cache round-trip with this chunk's encoding
+                    lookup = _PREFETCH_EXECUTOR.submit(self._cache.get_batch, chunks[n + 1])
+                cache_hits += len(chunk) - len(uncached_indices)
+                result.extend(self._fill_uncached(chunk, cached_results, uncached_indices, show_progress))
             
-            if not uncached_indices:
+            if cache_hits == len(texts):
                 logger.info(f"Cache hit: All {len(texts)} embeddings from cache")
-                return np.array(cached_results)
-            
-            cache_hits = len(texts) - len(uncached_indices)
-            if cache_hits > 0:
-                logger.info(f"Cache: {cache_hits}/{len(texts)} hits, computing {len(uncached_indices)} new")
-            
-            uncached_texts = [texts[i] for i in uncached_indices]
-            new_embeddings = self._embed_batch(uncached_texts, show_progress)
-            
-            for idx, embedding in zip(uncached_indices, new_embeddings):
-                self._cache.set_embedding(texts[idx], embedding)
-            
-            result = []
-            new_idx = 0
-            for i, cached in enumerate(cached_results):
-                if cached is not None:
-                    result.append(cached)
-                else:
-                    result.append(new_embeddings[new_idx])
-                    new_idx += 1
+            elif cache_hits > 0:
+                logger.info(f"Cache: {cache_hits}/{len(texts)} hits, computed {len(texts) - cache_hits} new")
             
             return np.array(result)
         
         logger.info(f"Embedding {len(texts)} texts (no cache)...")
         return self._embed_batch(texts, show_progress)
 
+    def bulk_indexing(self):
+        """Context manager that skips embedding cache writes during bulk indexing."""
+        if self._cache is None:
+            return nullcontext()
+        return self._cache.bulk_indexing()
+
+    def _fill_uncached(
+        self,
+        texts: list[str],
+        cached_results: list[np.ndarray | None],
+        uncached_indices: list[int],
+        show_progress: bool,
+    ) -> list[np.ndarray]:
+        """Encode and cache the misses of one chunk, merging them with its cache hits."""
+        if not uncached_indices:
+            return cached_results
+        
+        # Encode each distinct missing text once, even if it repeats within the chunk
+        uncached_texts = list(dict.fromkeys(texts[i] for i in uncached_indices))
+        new_embeddings = self._embed_batch(uncached_texts, show_progress)
+        self._cache.set_batch(uncached_texts, list(new_embeddings))
+        
+        by_text = dict(zip(uncached_texts, new_embeddings))
+        return [
+            cached if cached is not None else by_text[text]
+            for text, cached in zip(texts, cached_results)
+        ]
+
     def _embed_batch(self, texts: list[str], show_progress: bool = True) -> np.ndarray:
         """Embed batch of texts using the model."""
         embeddings = self.model.encode(
@@ -1,8 +1,10 @@
 """Main RAG pipeline orchestrating ingestion, retrieval, and generation."""
 
+import asyncio
 import hashlib
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -16,9 +18,10 @@ from app.config import settings
 from app.core.generation import get_generator
 from app.core.ingestion import DataLoader, get_embedder
 from app.core.retrieval import (
+    LEXICAL_INDEX_VERSION,
+    get_async_reranker,
     get_hybrid_searcher,
     get_lexical_searcher,
-    get_reranker,
     get_semantic_searcher,
 )
 
@@ -38,17 +41,26 @@ class RAGPipeline:
         self.use_reranker = use_reranker
         self.use_query_cache = use_query_cache
         self._initialized = False
+        self._init_lock = threading.Lock()
         
         self.embedder = get_embedder(use_cache=True)
         self.lexical_searcher = get_lexical_searcher()
         self.semantic_searcher = get_semantic_searcher(
             collection_name=settings.chroma_collection_name,
             persist_dir=settings.chroma_persist_dir,
+            cache_size=settings.semantic_cache_size,
+            cache_threshold=settings.semantic_cache_threshold,
+            insert_batch_size=settings.chroma_insert_batch_size,
         )
         self.hybrid_searcher = get_hybrid_searcher(use_parallel=True)
         self.generator = get_generator()
         
         self._state_file = Path(self.data_dir).parent / "index.state"
+        self._lexical_index_dir = Path(self.data_dir).parent / "lexical_index"
+        
+        self._funds_source: list | None = None
+        self._funds_by_name: dict = {}
+        self._funds_by_id: dict = {}
         
         self._query_cache = None
         if use_query_cache:
@@ -60,14 +72,36 @@ class RAGPipeline:
                 logger.warning(f"Query cache not available: {e}")
         
         try:
-            self.reranker = get_reranker() if use_reranker else None
+            self.reranker = get_async_reranker() if use_reranker else None
         except Exception as e:
             logger.warning(f"Reranker not available: {e}")
             self.reranker = None
 
-    def _get_current_state_hash(self) -> str:
-        """Generate MD5 hash of data files and config for change detection."""
+    def _load_saved_file_states(self) -> dict[str, dict]:
+        """Load per-file stat/hash entries from the state file, if present."""
+        try:
+            saved_state = json.loads(self._state_file.read_text())
+            return saved_state.get("files", {})
+        except Exception:
+            return {}
+
+    def _hash_file(self, file_path: Path) -> str:
+        """Generate MD5 hash of a single file's contents."""
+        hasher = hashlib.md5()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(4096), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _get_current_state_hash(self) -> tuple[str, dict[str, dict]]:
+        """Generate combined hash of data files and config for change detection.
+
+        Files whose size and mtime match the saved state reuse their stored hash,
+        so only changed files are re-read.
+        """
         hasher = hashlib.md5()
+        saved_files = self._load_saved_file_states()
+        file_states: dict[str, dict] = {}
         
         files = [
             Path(settings.faqs_path),
@@ -77,9 +111,23 @@ class RAGPipeline:
         for file_path in files:
             if file_path.exists():
                 try:
-                    with open(file_path, "rb") as f:
-                        for chunk in iter(lambda: f.read(4096), b""):
-                            hasher.update(chunk)
+                    stat = file_path.stat()
+                    saved = saved_files.get(str(file_path))
+                    if (
+                        saved
+                        and saved.get("size") == stat.st_size
+                        and saved.get("mtime_ns") == stat.st_mtime_ns
+                        and saved.get("hash")
+                    ):
+                        file_hash = saved["hash"]
+                    else:
+                        file_hash = self._hash_file(file_path)
+                    file_states[str(file_path)] = {
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                        "hash": file_hash,
+                    }
+                    hasher.update(file_hash.encode())
                 except Exception as e:
                     logger.warning(f"Failed to hash file {file_path}: {e}")
             else:
@@ -89,13 +137,18 @@ class RAGPipeline:
         hasher.update(settings.embedding_model.encode())
         hasher.update(str(settings.embedding_dimension).encode())
         
-        return hasher.hexdigest()
+        return hasher.hexdigest(), file_states
 
     def initialize(self, clear_existing: bool = False) -> None:
-        """Initialize pipeline with hash-based change detection for fast startup."""
+        """Initialize pipeline once, even when startup and a request race to do it."""
         if self._initialized:
             return
-            
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize(clear_existing)
+
+    def _initialize(self, clear_existing: bool = False) -> None:
+        """Initialize pipeline with hash-based change detection for fast startup."""
         logger.info("Initializing RAG pipeline...")
         
         loader = DataLoader(
@@ -112,10 +165,18 @@ class RAGPipeline:
             
         logger.info(f"Loaded {len(documents)} documents from CSV files")
         
-        self.lexical_searcher.index_documents(documents)
-        logger.info("✓ Lexical search index built")
+        current_hash, file_states = self._get_current_state_hash()
+        lexical_key = f"v{LEXICAL_INDEX_VERSION}:{current_hash}"
         
-        current_hash = self._get_current_state_hash()
+        if not clear_existing and self.lexical_searcher.load_index(self._lexical_index_dir, lexical_key):
+            logger.info("✓ Lexical search index loaded from disk")
+        else:
+            self.lexical_searcher.index_documents(documents)
+            logger.info("✓ Lexical search index built")
+            try:
+                self.lexical_searcher.save_index(self._lexical_index_dir, lexical_key)
+            except Exception as e:
+                logger.warning(f"⚠ Failed to save lexical index: {e}")
         should_reindex = clear_existing
         
         if not clear_existing and self._state_file.exists():
@@ -129,6 +190,7 @@ class RAGPipeline:
                         doc_count = self.semantic_searcher.document_count
                         
                         if doc_count > 0:
+                            self.semantic_searcher.attach_documents(documents)
                             logger.info("Data/Config unchanged. Using persistent vector store.")
                             logger.info(f"✓ Loaded {doc_count} documents from persistent store (instant startup!)")
                             self._initialized = True
@@ -168,7 +230,8 @@ class RAGPipeline:
                 logger.warning(f"⚠ Failed to clear existing semantic index (may not exist): {e}")
             
             texts = [doc["text"] for doc in documents]
-            embeddings = self.embedder.embed_texts(texts)
+            with self.embedder.bulk_indexing():
+                embeddings = self.embedder.embed_texts(texts)
             
             self.semantic_searcher.index_documents(documents, embeddings)
             logger.info("✓ Semantic search index built and persisted")
@@ -178,6 +241,7 @@ class RAGPipeline:
                     "hash": current_hash,
                     "document_count": len(documents),
                     "embedding_model": settings.embedding_model,
+                    "files": file_states,
                 }
                 self._state_file.parent.mkdir(parents=True, exist_ok=True)
                 self._state_file.write_text(json.dumps(state_data, indent=2))
@@ -205,48 +269,51 @@ class RAGPipeline:
        
         normalized_query = " ".join(query.strip().lower().split())
         
-        
+        cache_key = None
         if self._query_cache and self.use_query_cache:
-            cached = self._query_cache.get(
+            cache_key = self._query_cache.make_key(
                 query=normalized_query,
                 search_mode=search_mode.value,
                 top_k=top_k,
                 source_filter=source_filter,
             )
+            cached = self._query_cache.get(cache_key)
             if cached:
                 logger.info(f"Query cache HIT! Query: '{normalized_query[:50]}...' | Cache size: {self._query_cache._cache.size}")
-                return QueryResponse(**cached)
+                return QueryResponse.model_validate_json(cached)
             else:
                 logger.info(f"Query cache MISS. Query: '{normalized_query[:50]}...' | Cache size: {self._query_cache._cache.size}")
         
         if not self._initialized:
-            self.initialize()
+            # Initialization blocks on disk, the model and _init_lock; keep it off the event loop
+            await asyncio.to_thread(self.initialize)
 
-        query_embedding = self.embedder.embed_query(normalized_query)
-        
         if search_mode == SearchMode.LEXICAL:
             results = self.lexical_searcher.search(
                 query=normalized_query,
                 top_k=top_k,
                 source_filter=source_filter,
             )
-        elif search_mode == SearchMode.SEMANTIC:
-            results = self.semantic_searcher.search(
-                query_embedding=query_embedding,
-                top_k=top_k,
-                source_filter=source_filter,
-            )
         else:
-            results = self.hybrid_searcher.search(
-                query=normalized_query,
-                query_embedding=query_embedding,
-                top_k=top_k,
-                source_filter=source_filter,
-            )
+            query_embedding = await asyncio.to_thread(self.embedder.embed_query, normalized_query)
+            if search_mode == SearchMode.SEMANTIC:
+                results = await self.semantic_searcher.asearch(
+                    query_embedding=query_embedding,
+                    top_k=top_k,
+                    source_filter=source_filter,
+                )
+            else:
+                results = await asyncio.to_thread(
+                    self.hybrid_searcher.search,
+                    query=normalized_query,
+                    query_embedding=query_embedding,
+                    top_k=top_k,
+                    source_filter=source_filter,
+                )
 
         if rerank and self.reranker and results:
             try:
-                results = self.reranker.rerank(
+                results = await self.reranker.rerank(
                     query=normalized_query,
                     results=results,
                     top_k=min(top_k, len(results)),
@@ -293,14 +360,8 @@ class RAGPipeline:
             search_mode=search_mode,
         )
         
-        if self._query_cache and self.use_query_cache:
-            self._query_cache.set(
-                query=normalized_query,
-                search_mode=search_mode.value,
-                top_k=top_k,
-                result=response.model_dump(),
-                source_filter=source_filter,
-            )
+        if cache_key is not None:
+            self._query_cache.set(cache_key, response.model_dump_json().encode())
             logger.info(f"Query cached. Query: '{normalized_query[:50]}...' | Cache size: {self._query_cache._cache.size}")
 
         return response
@@ -334,10 +395,20 @@ class RAGPipeline:
         
         return "hybrid"
 
-    def _extract_fund_info(self, results: list) -> list[FundInfo]:
-        """Extract fund information from results with fallback to funds cache."""
+    def _get_fund_lookups(self) -> tuple[dict, dict]:
+        """Get fund name/id lookup maps, rebuilt only when the funds cache is reloaded."""
+        # Imported lazily: app.api.v1.funds imports app.core during its own import.
         from app.api.v1.funds import get_funds
         
+        all_funds = get_funds()
+        if all_funds is not self._funds_source:
+            self._funds_by_name = {f.fund_name: f for f in all_funds}
+            self._funds_by_id = {f.id: f for f in all_funds}
+            self._funds_source = all_funds
+        return self._funds_by_name, self._funds_by_id
+
+    def _extract_fund_info(self, results: list) -> list[FundInfo]:
+        """Extract fund information from results with fallback to funds cache."""
         def _to_float(value) -> float | None:
             """Convert value to float handling None and string cases."""
             if value is None:
@@ -355,9 +426,7 @@ class RAGPipeline:
         seen_names = set()
         
         try:
-            all_funds = get_funds()
-            funds_by_name = {f.fund_name: f for f in all_funds}
-            funds_by_id = {f.id: f for f in all_funds}
+            funds_by_name, funds_by_id = self._get_fund_lookups()
         except Exception as e:
             logger.warning(f"Could not load funds cache for fallback: {e}")
             funds_by_name = {}
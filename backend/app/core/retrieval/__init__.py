@@ -1,11 +1,24 @@
 """Search implementations: lexical, semantic, and hybrid."""
 
 from app.core.retrieval.hybrid import HybridSearcher, HybridSearchResult, get_hybrid_searcher
-from app.core.retrieval.lexical import LexicalSearcher, LexicalSearchResult, get_lexical_searcher
-from app.core.retrieval.reranker import MockReranker, Reranker, RerankedResult, get_reranker
+from app.core.retrieval.lexical import (
+    LEXICAL_INDEX_VERSION,
+    LexicalSearcher,
+    LexicalSearchResult,
+    get_lexical_searcher,
+)
+from app.core.retrieval.reranker import (
+    AsyncReranker,
+    MockReranker,
+    Reranker,
+    RerankedResult,
+    get_async_reranker,
+    get_reranker,
+)
 from app.core.retrieval.semantic import SemanticSearcher, SemanticSearchResult, get_semantic_searcher
 
 __all__ = [
+    "LEXICAL_INDEX_VERSION",
     "LexicalSearcher",
     "LexicalSearchResult",
     "get_lexical_searcher",
@@ -16,7 +29,9 @@ __all__ = [
     "HybridSearchResult",
     "get_hybrid_searcher",
     "Reranker",
+    "AsyncReranker",
     "MockReranker",
     "RerankedResult",
     "get_reranker",
+    "get_async_reranker",
 ]
@@ -1,6 +1,10 @@
 """Hybrid search combining lexical and semantic retrieval using RRF."""
 
+import hashlib
 import logging
+import os
+import threading
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any
@@ -12,8 +16,13 @@ from app.core.retrieval.semantic import SemanticSearcher, get_semantic_searcher
 
 logger = logging.getLogger(__name__)
 
+_HYBRID_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix="hybrid-search",
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class HybridSearchResult:
     """Hybrid search result with combined scores from lexical and semantic searches."""
     
@@ -37,12 +46,34 @@ class HybridSearcher:
         semantic_searcher: SemanticSearcher | None = None,
         rrf_k: int = 60,
         use_parallel: bool = True,
+        overlap_threshold: float = 0.6,
+        gap_threshold: float = 0.05,
+        cache_size: int = 1024,
+        executor: ThreadPoolExecutor | None = None,
     ):
         self.lexical_searcher = lexical_searcher or get_lexical_searcher()
         self.semantic_searcher = semantic_searcher or get_semantic_searcher()
         self.rrf_k = rrf_k
         self.use_parallel = use_parallel
-        self._executor = ThreadPoolExecutor(max_workers=2) if use_parallel else None
+        self.overlap_threshold = overlap_threshold
+        self.gap_threshold = gap_threshold
+        self.cache_size = cache_size
+        self._result_cache: OrderedDict[tuple, list[HybridSearchResult]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor = (executor or _HYBRID_EXECUTOR) if use_parallel else None
+
+    def close(self) -> None:
+        """Stop using the executor; sequential search keeps working afterwards.
+
+        The executor is shared (or owned by the caller), so it is not shut down here.
+        """
+        self._executor = None
+
+    def __enter__(self) -> "HybridSearcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def search(
         self,
@@ -51,39 +82,83 @@ class HybridSearcher:
         top_k: int = 5,
         source_filter: str | None = None,
         alpha: float = 0.5,
+        fetch_k: int | None = None,
     ) -> list[HybridSearchResult]:
-        """Perform hybrid search using RRF fusion of lexical and semantic results."""
-        fetch_k = top_k * 3
+        """Perform hybrid search using RRF fusion of lexical and semantic results.
 
-        if self.use_parallel and self._executor:
-            lexical_results, semantic_results = self._parallel_search(
-                query, query_embedding, fetch_k, source_filter
-            )
-        else:
-            lexical_results = self.lexical_searcher.search(
-                query=query,
-                top_k=fetch_k,
-                source_filter=source_filter,
-            )
-            semantic_results = self.semantic_searcher.search(
-                query_embedding=query_embedding,
-                top_k=fetch_k,
-                source_filter=source_filter,
-            )
+        When ``fetch_k`` is not given, both backends are first queried shallowly
+        and only re-queried at ``top_k * 3`` if their top results disagree and the
+        fused cut-off at ``top_k`` is ambiguous.
+        Exact repeats of a search are served from an LRU cache of fused results.
+        """
+        cache_key = (
+            query,
+            hashlib.blake2b(query_embedding.tobytes(), digest_size=16).digest(),
+            top_k,
+            source_filter,
+            alpha,
+            fetch_k,
+            self.lexical_searcher.index_version,
+        )
+        with self._cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                return list(cached)
 
-        lexical_map = {}
-        for rank, result in enumerate(lexical_results, 1):
-            lexical_map[result.id] = (rank, result)
+        results = self._search(query, query_embedding, top_k, source_filter, alpha, fetch_k)
 
-        semantic_map = {}
-        for rank, result in enumerate(semantic_results, 1):
-            semantic_map[result.id] = (rank, result)
+        with self._cache_lock:
+            self._result_cache[cache_key] = results
+            if len(self._result_cache) > self.cache_size:
+                self._result_cache.popitem(last=False)
+        return list(results)
 
-        all_ids = set(lexical_map.keys()) | set(semantic_map.keys())
+    def _search(
+        self,
+        query: str,
+        query_embedding: np.ndarray,
+        top_k: int,
+        source_filter: str | None,
+        alpha: float,
+        fetch_k: int | None,
+    ) -> list[HybridSearchResult]:
+        """Run an uncached hybrid search."""
+        max_fetch_k = top_k * 3
+        initial_fetch_k = fetch_k if fetch_k is not None else min(top_k + 5, max_fetch_k)
+        lexical_results, semantic_results = self._retrieve(
+            query, query_embedding, initial_fetch_k, source_filter
+        )
+        all_ids, lexical_index, semantic_index, rrf_scores = self._fuse(
+            lexical_results, semantic_results, alpha
+        )
+
+        if fetch_k is None and initial_fetch_k < max_fetch_k:
+            exhausted = (
+                len(lexical_results) < initial_fetch_k
+                and len(semantic_results) < initial_fetch_k
+            )
+            if (
+                not exhausted
+                and not self._rankings_agree(lexical_results, semantic_results, top_k)
+                and self._cutoff_ambiguous(rrf_scores, top_k)
+            ):
+                lexical_results, semantic_results = self._retrieve(
+                    query, query_embedding, max_fetch_k, source_filter
+                )
+                all_ids, lexical_index, semantic_index, rrf_scores = self._fuse(
+                    lexical_results, semantic_results, alpha
+                )
+
+        if len(rrf_scores) > top_k:
+            top = np.argpartition(-rrf_scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(len(rrf_scores))
+        top = top[np.lexsort((top, -rrf_scores[top]))]
 
         scored_results = []
         
-        for doc_id in all_ids:
+        for union_idx in top:
             lexical_rank = None
             lexical_score = None
             semantic_rank = None
@@ -92,34 +167,30 @@ class HybridSearcher:
             metadata = {}
             source = "unknown"
 
-            if doc_id in lexical_map:
-                lexical_rank, lex_result = lexical_map[doc_id]
+            lex_idx = lexical_index[union_idx]
+            if lex_idx >= 0:
+                lex_result = lexical_results[lex_idx]
+                lexical_rank = int(lex_idx) + 1
                 lexical_score = lex_result.score
                 text = lex_result.text
                 metadata = lex_result.metadata
                 source = lex_result.source
 
-            if doc_id in semantic_map:
-                semantic_rank, sem_result = semantic_map[doc_id]
+            sem_idx = semantic_index[union_idx]
+            if sem_idx >= 0:
+                sem_result = semantic_results[sem_idx]
+                semantic_rank = int(sem_idx) + 1
                 semantic_score = sem_result.score
                 if not text:
                     text = sem_result.text
                     metadata = sem_result.metadata
                     source = sem_result.source
 
-            rrf_score = 0.0
-            
-            if lexical_rank is not None:
-                rrf_score += (1 - alpha) * (1 / (self.rrf_k + lexical_rank))
-            
-            if semantic_rank is not None:
-                rrf_score += alpha * (1 / (self.rrf_k + semantic_rank))
-
             scored_results.append(
                 HybridSearchResult(
-                    id=doc_id,
+                    id=all_ids[union_idx],
                     text=text,
-                    score=rrf_score,
+                    score=float(rrf_scores[union_idx]),
                     lexical_score=lexical_score,
                     semantic_score=semantic_score,
                     lexical_rank=lexical_rank,
@@ -128,15 +199,87 @@ class HybridSearcher:
                     source=source,
                 )
             )
-
-        scored_results.sort(key=lambda x: x.score, reverse=True)
         
         logger.debug(
-            f"Hybrid: {len(lexical_results)} lexical + "
-            f"{len(semantic_results)} semantic = {len(scored_results)} combined"
+            "Hybrid: %d lexical + %d semantic = %d combined",
+            len(lexical_results),
+            len(semantic_results),
+            len(all_ids),
         )
         
-        return scored_results[:top_k]
+        return scored_results
+
+    def _fuse(
+        self,
+        lexical_results: list,
+        semantic_results: list,
+        alpha: float,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Compute RRF scores over the union of ids, plus each id's position per ranking."""
+        lexical_ids = np.array([r.id for r in lexical_results], dtype=object)
+        semantic_ids = np.array([r.id for r in semantic_results], dtype=object)
+        all_ids = np.unique(np.concatenate([lexical_ids, semantic_ids]))
+
+        lexical_index = self._union_positions(all_ids, lexical_ids)
+        semantic_index = self._union_positions(all_ids, semantic_ids)
+
+        rrf_scores = (1 - alpha) * self._rrf_terms(lexical_index) + alpha * self._rrf_terms(semantic_index)
+        return all_ids, lexical_index, semantic_index, rrf_scores
+
+    def _cutoff_ambiguous(self, rrf_scores: np.ndarray, top_k: int) -> bool:
+        """Check whether the top_k-th and next fused scores are too close to trust."""
+        if len(rrf_scores) < top_k:
+            return True
+        if len(rrf_scores) == top_k:
+            return False
+        kth, following = -np.partition(-rrf_scores, (top_k - 1, top_k))[top_k - 1 : top_k + 1]
+        return kth - following <= self.gap_threshold * kth
+
+    def _rrf_terms(self, positions: np.ndarray) -> np.ndarray:
+        """Compute 1 / (rrf_k + rank) per union id, 0 where the id was not retrieved."""
+        return np.where(positions >= 0, 1.0 / (self.rrf_k + positions + 1.0), 0.0)
+
+    @staticmethod
+    def _union_positions(all_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        """Map each union id to its 0-based position in ``ids``, or -1 if absent."""
+        positions = np.full(len(all_ids), -1, dtype=np.int32)
+        if len(ids):
+            positions[np.searchsorted(all_ids, ids)] = np.arange(len(ids), dtype=np.int32)
+        return positions
+
+    def _retrieve(
+        self,
+        query: str,
+        query_embedding: np.ndarray,
+        fetch_k: int,
+        source_filter: str | None,
+    ) -> tuple[list, list]:
+        """Fetch candidates from both backends, in parallel when enabled."""
+        if self.use_parallel and self._executor:
+            return self._parallel_search(query, query_embedding, fetch_k, source_filter)
+
+        lexical_results = self.lexical_searcher.search(
+            query=query,
+            top_k=fetch_k,
+            source_filter=source_filter,
+        )
+        semantic_results = self.semantic_searcher.search(
+            query_embedding=query_embedding,
+            top_k=fetch_k,
+            source_filter=source_filter,
+        )
+        return lexical_results, semantic_results
+
+    def _rankings_agree(self, lexical_results: list, semantic_results: list, top_k: int) -> bool:
+        """Check whether the top_k ids of both rankings overlap enough to skip a deeper fetch."""
+        lexical_ids = {r.id for r in lexical_results[:top_k]}
+        semantic_ids = {r.id for r in semantic_results[:top_k]}
+        return len(lexical_ids & semantic_ids) >= self.overlap_threshold * top_k
+
+    def clear_cache(self) -> None:
+        """Drop all cached fused results."""
+        with self._cache_lock:
+            self._result_cache.clear()
 
     def _parallel_search(
         self,
@@ -145,31 +288,27 @@ class HybridSearcher:
         top_k: int,
         source_filter: str | None,
     ) -> tuple[list, list]:
-        """Run lexical and semantic searches in parallel for faster retrieval."""
+        """Run lexical and semantic searches in parallel for faster retrieval.
+
+        Only the lexical search is handed to the executor; the semantic search runs
+        on the calling thread meanwhile, saving a submit/result round-trip.
+        """
         lexical_future = self._executor.submit(
             self.lexical_searcher.search,
             query=query,
             top_k=top_k,
             source_filter=source_filter,
         )
-        semantic_future = self._executor.submit(
-            self.semantic_searcher.search,
+        semantic_results = self.semantic_searcher.search(
             query_embedding=query_embedding,
             top_k=top_k,
             source_filter=source_filter,
         )
-        
         lexical_results = lexical_future.result()
-        semantic_results = semantic_future.result()
         
         logger.debug("Parallel retrieval completed")
         return lexical_results, semantic_results
 
-    def __del__(self):
-        """Cleanup executor on deletion."""
-        if self._executor:
-            self._executor.shutdown(wait=False)
-
 
 _hybrid_searcher: HybridSearcher | None = None
 
@@ -1,16 +1,52 @@
 """BM25-based lexical/keyword search implementation."""
 
 import logging
+import math
+import pickle
 import re
+import threading
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
-from rank_bm25 import BM25Okapi
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
-@dataclass
+_INDEX_ARRAYS = ("indptr", "posting_doc_ids", "posting_tfs", "idf", "doc_len", "doc_norm")
+_INDEX_META_FILE = "index.pkl"
+
+# Bump whenever the tokenizer, vocabulary encoding or on-disk layout changes so
+# persisted indexes keyed on data alone are rebuilt instead of silently reused.
+LEXICAL_INDEX_VERSION = 1
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    numba = None
+
+
+@dataclass(frozen=True, slots=True)
+class _IndexSnapshot:
+    """Mutually consistent index arrays captured under the merge lock for one search."""
+    indptr: np.ndarray
+    posting_doc_ids: np.ndarray
+    posting_tfs: np.ndarray
+    idf: np.ndarray
+    doc_norm: np.ndarray
+    ids: np.ndarray
+    texts: np.ndarray
+    sources: np.ndarray
+    metadata: np.ndarray
+    source_index: dict[str, np.ndarray]
+
+
+@dataclass(slots=True)
 class LexicalSearchResult:
     """BM25 lexical search result."""
     
@@ -21,20 +57,114 @@ class LexicalSearchResult:
     source: str
 
 
+if NUMBA_AVAILABLE:
+
+    @numba.njit(cache=True, fastmath=True)
+    def _compute_relevance_jit(indptr, doc_ids, tfs, idf, doc_norm, query_term_ids, k1, scores):
+        """Accumulate BM25 scores into ``scores`` from CSR posting lists."""
+        for term_id in query_term_ids:
+            weight = idf[term_id]
+            for j in range(indptr[term_id], indptr[term_id + 1]):
+                doc = doc_ids[j]
+                tf = tfs[j]
+                scores[doc] += weight * tf * (k1 + 1.0) / (tf + doc_norm[doc])
+
+    @numba.njit(cache=True)
+    def _top_k_jit(scores, candidates, k):
+        """Select the k best candidates with a bounded min-heap, ties to lower index."""
+        heap = np.empty(min(k, len(candidates)), dtype=np.int64)
+        size = 0
+        for cand in candidates:
+            if size < len(heap):
+                pos = size
+                heap[pos] = cand
+                size += 1
+                while pos > 0:
+                    parent = (pos - 1) >> 1
+                    a = heap[pos]
+                    p = heap[parent]
+                    if scores[a] < scores[p] or (scores[a] == scores[p] and a > p):
+                        heap[pos] = p
+                        heap[parent] = a
+                        pos = parent
+                    else:
+                        break
+            elif scores[cand] > scores[heap[0]]:
+                heap[0] = cand
+                pos = 0
+                while True:
+                    left = 2 * pos + 1
+                    right = left + 1
+                    worst = pos
+                    for child in (left, right):
+                        if child < size:
+                            c = heap[child]
+                            w = heap[worst]
+                            if scores[c] < scores[w] or (scores[c] == scores[w] and c > w):
+                                worst = child
+                    if worst == pos:
+                        break
+                    tmp = heap[pos]
+                    heap[pos] = heap[worst]
+                    heap[worst] = tmp
+                    pos = worst
+        selected = np.sort(heap[:size])
+        return selected[np.argsort(-scores[selected], kind="mergesort")]
+
+
 class LexicalSearcher:
-    """BM25-based lexical search for exact keyword matching."""
+    """BM25-based lexical search over an inverted index.
 
-    def __init__(self):
-        self._index: BM25Okapi | None = None
-        self._documents: list[dict] = []
-        self._tokenized_docs: list[list[str]] = []
+    Scoring follows BM25Okapi (including its epsilon floor for negative idf) but
+    only touches the posting lists of the query terms instead of every document.
+    Posting lists are stored CSR-style so scoring can run in a numba kernel when
+    numba is installed.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        cache_size: int = 1024,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._vocab: dict[str, int] = {}
+        self._indptr: np.ndarray | None = None
+        self._posting_doc_ids: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._posting_tfs: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._idf: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._doc_len: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._doc_norm: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._avgdl: float = 0.0
+        self._ids: np.ndarray = np.empty(0, dtype=object)
+        self._texts: np.ndarray = np.empty(0, dtype=object)
+        self._sources: np.ndarray = np.empty(0, dtype=object)
+        self._metadata: np.ndarray = np.empty(0, dtype=object)
+        self._source_index: dict[str, np.ndarray] = {}
+        self._tokenized_docs: list[np.ndarray] = []
+        self._pending_postings: dict[int, tuple[list[int], list[int]]] = {}
+        self._index_dirty = False
+        # Guards every index mutation; searches snapshot the arrays under it (reentrant for merges)
+        self._merge_lock = threading.RLock()
+        self._index_version = 0
+        self._cached_search = lru_cache(maxsize=cache_size)(self._search)
 
     def _tokenize(self, text: str) -> list[str]:
         """Tokenize text for BM25 indexing."""
-        text = text.lower()
-        text = re.sub(r"[^a-z0-9\s]", " ", text)
-        tokens = [t.strip() for t in text.split() if t.strip()]
-        return tokens
+        return _TOKEN_RE.findall(text.lower())
+
+    def _encode(self, text: str) -> np.ndarray:
+        """Tokenize text into int32 term ids, adding unseen terms to the vocabulary."""
+        vocab = self._vocab
+        tokens = _TOKEN_RE.findall(text.lower())
+        return np.fromiter(
+            (vocab.setdefault(token, len(vocab)) for token in tokens),
+            dtype=np.int32,
+            count=len(tokens),
+        )
 
     def index_documents(self, documents: list[dict]) -> None:
         """Index documents for BM25 search."""
@@ -42,16 +172,321 @@ class LexicalSearcher:
             logger.warning("No documents to index")
             return
 
-        logger.info(f"Indexing {len(documents)} documents for lexical search...")
+        logger.info("Indexing %d documents for lexical search...", len(documents))
         
-        self._documents = documents
-        self._tokenized_docs = [
-            self._tokenize(doc["text"]) for doc in documents
-        ]
+        with self._merge_lock:
+            self._ids = np.array([doc["id"] for doc in documents], dtype=object)
+            self._texts = np.array([doc["text"] for doc in documents], dtype=object)
+            self._sources = np.array([doc.get("source", "unknown") for doc in documents], dtype=object)
+            self._metadata = np.empty(len(documents), dtype=object)
+            self._metadata[:] = [doc.get("metadata", {}) for doc in documents]
+            self._source_index = {
+                source: np.flatnonzero(self._sources == source)
+                for source in set(self._sources)
+            }
+            token_lists = np.empty(len(documents), dtype=object)
+            for i, doc in enumerate(documents):
+                token_lists[i] = _TOKEN_RE.findall(doc["text"].lower())
+            doc_len = np.fromiter(
+                (len(tokens) for tokens in token_lists), dtype=np.int64, count=len(documents)
+            )
+
+            # Encode every token straight into one pre-sized term-id buffer; per-document
+            # token arrays are views into it.
+            self._vocab = {}
+            vocab = self._vocab
+            term_ids = np.fromiter(
+                (vocab.setdefault(token, len(vocab)) for tokens in token_lists for token in tokens),
+                dtype=np.int32,
+                count=int(doc_len.sum()),
+            )
+            self._tokenized_docs = np.split(term_ids, np.cumsum(doc_len[:-1]))
         
-        self._index = BM25Okapi(self._tokenized_docs)
+            self._pending_postings = {}
+            self._index_dirty = False
+            self._build_index(term_ids, doc_len)
         
-        logger.info(f"Indexed {len(documents)} documents")
+        if NUMBA_AVAILABLE:
+            self._warmup_jit()
+        
+        self._invalidate_cache()
+        logger.info("Indexed %d documents", len(documents))
+
+    def append_documents(self, documents: list[dict]) -> None:
+        """Add documents without rebuilding the index.
+
+        New postings are buffered per term and merged into the CSR arrays, together
+        with the idf and length-normalisation refresh, on the next search.
+        """
+        if not documents:
+            return
+        if self._indptr is None:
+            self.index_documents(documents)
+            return
+
+        metadata = np.empty(len(documents), dtype=object)
+        metadata[:] = [doc.get("metadata", {}) for doc in documents]
+        sources = np.array([doc.get("source", "unknown") for doc in documents], dtype=object)
+
+        with self._merge_lock:
+            start = len(self._ids)
+            self._index_dirty = True
+            tokenized_docs = [self._encode(doc["text"]) for doc in documents]
+            for doc_idx, term_ids in enumerate(tokenized_docs, start):
+                terms, counts = np.unique(term_ids, return_counts=True)
+                for term_id, tf in zip(terms.tolist(), counts.tolist()):
+                    doc_ids, tfs = self._pending_postings.setdefault(term_id, ([], []))
+                    doc_ids.append(doc_idx)
+                    tfs.append(tf)
+
+            self._ids = np.concatenate([self._ids, [doc["id"] for doc in documents]])
+            self._texts = np.concatenate([self._texts, [doc["text"] for doc in documents]])
+            self._sources = np.concatenate([self._sources, sources])
+            self._metadata = np.concatenate([self._metadata, metadata])
+            # Copy-on-write: in-flight searches hold the previous dict in their snapshot
+            source_index = dict(self._source_index)
+            for source in set(sources):
+                new_docs = start + np.flatnonzero(sources == source)
+                existing = source_index.get(source)
+                source_index[source] = (
+                    new_docs if existing is None else np.concatenate([existing, new_docs])
+                )
+            self._source_index = source_index
+            self._doc_len = np.concatenate([
+                self._doc_len,
+                np.array([len(tokens) for tokens in tokenized_docs], dtype=np.float32),
+            ])
+            self._tokenized_docs.extend(tokenized_docs)
+
+        self._invalidate_cache()
+        logger.info("Appended %d documents to lexical index", len(documents))
+
+    def _merge_pending(self) -> None:
+        """Fold buffered postings into the CSR arrays and refresh idf/doc norms."""
+        with self._merge_lock:
+            if not self._index_dirty:
+                return
+
+            num_terms = len(self._vocab)
+            old_df = np.zeros(num_terms, dtype=np.int64)
+            old_df[: len(self._indptr) - 1] = np.diff(self._indptr)
+            df = old_df.copy()
+            for term_id, (doc_ids, _) in self._pending_postings.items():
+                df[term_id] += len(doc_ids)
+
+            indptr = np.zeros(num_terms + 1, dtype=np.int64)
+            np.cumsum(df, out=indptr[1:])
+            posting_doc_ids = np.empty(int(indptr[-1]), dtype=np.int32)
+            posting_tfs = np.empty(int(indptr[-1]), dtype=np.float32)
+
+            # Existing postings keep their order; each term's block shifts by the
+            # number of new postings inserted before it.
+            shift = np.repeat(indptr[:-1] - np.concatenate([[0], np.cumsum(old_df)[:-1]]), old_df)
+            dest = np.arange(len(self._posting_doc_ids), dtype=np.int64) + shift
+            posting_doc_ids[dest] = self._posting_doc_ids
+            posting_tfs[dest] = self._posting_tfs
+
+            for term_id, (doc_ids, tfs) in self._pending_postings.items():
+                begin = indptr[term_id] + old_df[term_id]
+                posting_doc_ids[begin : indptr[term_id + 1]] = doc_ids
+                posting_tfs[begin : indptr[term_id + 1]] = tfs
+
+            self._indptr = indptr
+            self._posting_doc_ids = posting_doc_ids
+            self._posting_tfs = posting_tfs
+            self._compute_weights(df)
+            self._pending_postings = {}
+            self._index_dirty = False
+
+    def save_index(self, path: str | Path, key: str) -> None:
+        """Persist the built index under ``path`` so ``load_index`` can mmap it later."""
+        if self._indptr is None:
+            return
+        if self._index_dirty:
+            self._merge_pending()
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        meta_file = path / _INDEX_META_FILE
+        meta_file.unlink(missing_ok=True)
+
+        for name in _INDEX_ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self, f"_{name}"))
+        np.save(path / "token_ids.npy", np.concatenate(self._tokenized_docs))
+
+        meta = {
+            "key": key,
+            "params": (self.k1, self.b, self.epsilon),
+            "avgdl": self._avgdl,
+            "vocab": self._vocab,
+            "ids": self._ids,
+            "texts": self._texts,
+            "sources": self._sources,
+            "metadata": self._metadata,
+            "source_index": self._source_index,
+        }
+        with open(meta_file, "wb") as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info("Saved lexical index to %s", path)
+
+    def load_index(self, path: str | Path, key: str) -> bool:
+        """Load an index saved for ``key``; returns False if missing or stale."""
+        path = Path(path)
+        meta_file = path / _INDEX_META_FILE
+        if not meta_file.exists():
+            return False
+
+        try:
+            with open(meta_file, "rb") as f:
+                meta = pickle.load(f)
+            if meta["key"] != key or meta["params"] != (self.k1, self.b, self.epsilon):
+                return False
+            arrays = {
+                name: np.load(path / f"{name}.npy", mmap_mode="r")
+                for name in _INDEX_ARRAYS
+            }
+            token_ids = np.load(path / "token_ids.npy", mmap_mode="r")
+        except Exception as e:
+            logger.warning("Failed to load lexical index from %s: %s", path, e)
+            return False
+
+        with self._merge_lock:
+            for name, array in arrays.items():
+                setattr(self, f"_{name}", array)
+            self._avgdl = meta["avgdl"]
+            self._vocab = meta["vocab"]
+            self._ids = meta["ids"]
+            self._texts = meta["texts"]
+            self._sources = meta["sources"]
+            self._metadata = meta["metadata"]
+            self._source_index = meta["source_index"]
+            self._tokenized_docs = np.split(token_ids, np.cumsum(self._doc_len[:-1], dtype=np.int64))
+            self._pending_postings = {}
+            self._index_dirty = False
+
+        if NUMBA_AVAILABLE:
+            self._warmup_jit()
+
+        self._invalidate_cache()
+        logger.info("Loaded %d documents from lexical index at %s", len(self._ids), path)
+        return True
+
+    def _invalidate_cache(self) -> None:
+        """Retire cached search results after the index changes.
+
+        Bumping the version is what invalidates: it is part of every cache key, so a
+        search racing this call can only store its result under the old version.
+        Clearing just frees the memory.
+        """
+        self._index_version += 1
+        self._cached_search.cache_clear()
+
+    def _build_index(self, term_ids: np.ndarray, doc_len: np.ndarray) -> None:
+        """Build CSR posting lists, document lengths and BM25Okapi idf values.
+
+        ``term_ids`` holds every document's term ids back to back; ``doc_len`` gives
+        the number of tokens per document.
+        """
+        num_docs = len(doc_len)
+        doc_idx = np.repeat(np.arange(num_docs, dtype=np.int64), doc_len)
+
+        # Sorting (term, doc) pairs yields term-major postings with ascending doc ids.
+        pairs, tfs = np.unique(term_ids.astype(np.int64) * num_docs + doc_idx, return_counts=True)
+        df = np.bincount(pairs // num_docs, minlength=len(self._vocab))
+        self._indptr = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(df, out=self._indptr[1:])
+        self._posting_doc_ids = (pairs % num_docs).astype(np.int32)
+        self._posting_tfs = tfs.astype(np.float32)
+
+        self._doc_len = doc_len.astype(np.float32)
+        self._compute_weights(df)
+
+    def _compute_weights(self, df: np.ndarray) -> None:
+        """Derive length normalisation and BM25Okapi idf from doc lengths and term dfs."""
+        self._avgdl = float(self._doc_len.mean()) if len(self._doc_len) else 0.0
+        self._doc_norm = (
+            self.k1 * (1 - self.b + self.b * self._doc_len / (self._avgdl or 1.0))
+        ).astype(np.float32)
+
+        corpus_size = len(self._doc_len)
+        idf = np.log(corpus_size - df + 0.5) - np.log(df + 0.5)
+        if len(idf):
+            idf[idf < 0] = self.epsilon * idf.mean()
+        self._idf = idf.astype(np.float32)
+
+    def _warmup_jit(self) -> None:
+        """Compile the numba kernels once so the first query does not pay for it."""
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+        query_term_ids = np.zeros(min(1, len(self._idf)), dtype=np.int64)
+        _compute_relevance_jit(
+            self._indptr, self._posting_doc_ids, self._posting_tfs,
+            self._idf, self._doc_norm, query_term_ids, np.float32(self.k1), scores,
+        )
+        _top_k_jit(scores, np.flatnonzero(scores > 0), 1)
+
+    def _snapshot(self, query_tokens: list[str]) -> tuple[_IndexSnapshot, np.ndarray]:
+        """Merge pending postings, then capture the index and the query's term ids atomically."""
+        with self._merge_lock:
+            if self._index_dirty:
+                self._merge_pending()
+            vocab = self._vocab
+            query_term_ids = np.array(
+                [vocab[t] for t in query_tokens if t in vocab],
+                dtype=np.int64,
+            )
+            snapshot = _IndexSnapshot(
+                indptr=self._indptr,
+                posting_doc_ids=self._posting_doc_ids,
+                posting_tfs=self._posting_tfs,
+                idf=self._idf,
+                doc_norm=self._doc_norm,
+                ids=self._ids,
+                texts=self._texts,
+                sources=self._sources,
+                metadata=self._metadata,
+                source_index=self._source_index,
+            )
+        # Belt and braces: never hand the unchecked numba kernel a term id past the CSR arrays
+        return snapshot, query_term_ids[query_term_ids < len(snapshot.indptr) - 1]
+
+    def _score(self, query_term_ids: np.ndarray, index: _IndexSnapshot) -> np.ndarray:
+        """Accumulate BM25 scores for all documents from the query terms' posting lists."""
+        scores = np.zeros(len(index.ids), dtype=np.float32)
+
+        if NUMBA_AVAILABLE:
+            _compute_relevance_jit(
+                index.indptr, index.posting_doc_ids, index.posting_tfs,
+                index.idf, index.doc_norm, query_term_ids, np.float32(self.k1), scores,
+            )
+            return scores
+
+        for term_id in query_term_ids:
+            start, end = index.indptr[term_id], index.indptr[term_id + 1]
+            doc_ids = index.posting_doc_ids[start:end]
+            tfs = index.posting_tfs[start:end]
+            scores[doc_ids] += index.idf[term_id] * (
+                tfs * (self.k1 + 1) / (tfs + index.doc_norm[doc_ids])
+            )
+
+        return scores
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+        """Select the k best candidates by score, ties broken by document order."""
+        if k <= 0:
+            # The kernel would read and write heap[0] of an empty heap without bounds checks
+            return candidates[:0]
+        if NUMBA_AVAILABLE:
+            return _top_k_jit(scores, candidates, k)
+
+        if len(candidates) > k:
+            candidate_scores = scores[candidates]
+            pivot = len(candidates) - k
+            kth_score = np.partition(candidate_scores, pivot)[pivot]
+            above = candidates[candidate_scores > kth_score]
+            ties = candidates[candidate_scores == kth_score][: k - len(above)]
+            candidates = np.sort(np.concatenate([above, ties]))
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
 
     def search(
         self,
@@ -59,8 +494,22 @@ class LexicalSearcher:
         top_k: int = 5,
         source_filter: str | None = None,
     ) -> list[LexicalSearchResult]:
-        """Search for documents matching the query using BM25."""
-        if self._index is None:
+        """Search for documents matching the query using BM25.
+
+        Repeated (query, top_k, source_filter) lookups are served from an LRU cache
+        keyed on the index version, so entries never outlive an index change.
+        """
+        return list(self._cached_search(query, top_k, source_filter, self._index_version))
+
+    def _search(
+        self,
+        query: str,
+        top_k: int,
+        source_filter: str | None,
+        index_version: int,
+    ) -> list[LexicalSearchResult]:
+        """Run an uncached BM25 search; ``index_version`` only keys the result cache."""
+        if self._indptr is None:
             logger.warning("Index not built. Call index_documents first.")
             return []
 
@@ -69,45 +518,68 @@ class LexicalSearcher:
         if not query_tokens:
             return []
 
-        scores = self._index.get_scores(query_tokens)
-        scored_indices = [(score, idx) for idx, score in enumerate(scores)]
-        scored_indices.sort(key=lambda x: x[0], reverse=True)
+        index, query_term_ids = self._snapshot(query_tokens)
+        if index.indptr is None:
+            return []
+        scores = self._score(query_term_ids, index)
         
-        results = []
-        for score, idx in scored_indices:
-            if score <= 0:
-                continue
-                
-            doc = self._documents[idx]
-            
-            if source_filter and doc.get("source") != source_filter:
-                continue
-            
-            results.append(
-                LexicalSearchResult(
-                    id=doc["id"],
-                    text=doc["text"],
-                    score=float(score),
-                    metadata=doc.get("metadata", {}),
-                    source=doc.get("source", "unknown"),
-                )
+        if source_filter:
+            source_docs = index.source_index.get(source_filter)
+            if source_docs is None:
+                return []
+            candidates = source_docs[scores[source_docs] > 0]
+        else:
+            candidates = np.flatnonzero(scores > 0)
+        
+        candidates = self._top_k(scores, candidates, top_k)
+        
+        return [
+            LexicalSearchResult(
+                id=doc_id,
+                text=text,
+                score=score,
+                metadata=metadata,
+                source=source,
+            )
+            for doc_id, text, score, metadata, source in zip(
+                index.ids[candidates],
+                index.texts[candidates],
+                scores[candidates],
+                index.metadata[candidates],
+                index.sources[candidates],
             )
-            
-            if len(results) >= top_k:
-                break
+        ]
 
-        return results
+    @property
+    def index_version(self) -> int:
+        """Counter bumped whenever the index is rebuilt or cleared."""
+        return self._index_version
 
     @property
     def document_count(self) -> int:
         """Get number of indexed documents."""
-        return len(self._documents)
+        return len(self._ids)
     
     def clear(self) -> None:
         """Clear all indexed documents."""
-        self._index = None
-        self._documents = []
-        self._tokenized_docs = []
+        with self._merge_lock:
+            self._vocab = {}
+            self._indptr = None
+            self._posting_doc_ids = np.zeros(0, dtype=np.int32)
+            self._posting_tfs = np.zeros(0, dtype=np.float32)
+            self._idf = np.zeros(0, dtype=np.float32)
+            self._doc_len = np.zeros(0, dtype=np.float32)
+            self._doc_norm = np.zeros(0, dtype=np.float32)
+            self._avgdl = 0.0
+            self._ids = np.empty(0, dtype=object)
+            self._texts = np.empty(0, dtype=object)
+            self._sources = np.empty(0, dtype=object)
+            self._metadata = np.empty(0, dtype=object)
+            self._source_index = {}
+            self._tokenized_docs = []
+            self._pending_postings = {}
+            self._index_dirty = False
+        self._invalidate_cache()
         logger.info("Lexical index cleared")
 
 
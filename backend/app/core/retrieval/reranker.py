@@ -1,14 +1,30 @@
 """Rerank search results using Cohere Rerank API."""
 
+import asyncio
+import hashlib
 import logging
 import os
 from dataclasses import dataclass
 from typing import Any
 
+import httpx
+
 from app.config import settings
+from app.services.cache import InMemoryCache
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Keep-alive pool shared by all concurrent rerank calls of one client.
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+_HTTP_TIMEOUT = 10.0
+_HTTP_RETRIES = 2
+
 
 @dataclass
 class RerankedResult:
@@ -31,9 +47,12 @@ class Reranker:
         self,
         api_key: str | None = None,
         model: str = "rerank-english-v3.0",
+        cache_size: int = 2048,
+        cache_ttl: float = 3600,
     ):
         self.model = model
         self._client = None
+        self._cache = InMemoryCache(default_ttl=cache_ttl, max_size=cache_size)
         try:
             settings_key = settings.cohere_api_key.get_secret_value() if settings.cohere_api_key else None
         except Exception:
@@ -54,7 +73,13 @@ class Reranker:
             
             try:
                 import cohere
-                self._client = cohere.Client(self._api_key)
+                transport = httpx.HTTPTransport(
+                    retries=_HTTP_RETRIES, http2=HTTP2_AVAILABLE, limits=_HTTP_LIMITS
+                )
+                self._client = cohere.ClientV2(
+                    api_key=self._api_key,
+                    httpx_client=httpx.Client(transport=transport, timeout=_HTTP_TIMEOUT),
+                )
                 logger.info("Cohere client initialized")
             except ImportError:
                 logger.error("Cohere not installed. Run: pip install cohere")
@@ -71,8 +96,15 @@ class Reranker:
         """Rerank search results using Cohere API."""
         if not results:
             return []
+        if settings.skip_rerank_when_small and len(results) <= top_k:
+            return _passthrough(results, top_k)
 
-        documents = [r.text for r in results]
+        cache_key = self._cache_key(query, results, top_k)
+        cached = self._from_cache(cache_key, results)
+        if cached is not None:
+            return cached
+
+        documents, groups = _prepare_documents(results)
         
         try:
             response = self.client.rerank(
@@ -82,42 +114,235 @@ class Reranker:
                 top_n=min(top_k, len(documents)),
                 return_documents=False,
             )
+            reranked = _to_reranked(results, response.results, groups, top_k)
+            self._store(cache_key, reranked)
+            return reranked
             
-            reranked = []
-            for new_rank, item in enumerate(response.results, 1):
-                original_idx = item.index
-                original_result = results[original_idx]
-                
-                reranked.append(
-                    RerankedResult(
-                        id=original_result.id,
-                        text=original_result.text,
-                        original_score=original_result.score,
-                        rerank_score=item.relevance_score,
-                        original_rank=original_idx + 1,
-                        new_rank=new_rank,
-                        metadata=original_result.metadata,
-                        source=original_result.source,
-                    )
+        except Exception as e:
+            logger.error(f"Reranking failed: {e}")
+            return _passthrough(results, top_k)
+
+    def _cache_key(self, query: str, results: list, top_k: int) -> str:
+        """Key a rerank request by model, query, top_k and the set of result ids."""
+        doc_ids = ",".join(sorted(r.id for r in results))
+        payload = f"{self.model}|{top_k}|{query}|{doc_ids}"
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _from_cache(self, cache_key: str, results: list) -> list[RerankedResult] | None:
+        """Rebuild a cached ranking against the current results, or None on a miss."""
+        ranking = self._cache.get(cache_key)
+        if ranking is None:
+            return None
+        by_id = {r.id: (idx, r) for idx, r in enumerate(results)}
+        reranked = []
+        for doc_id, relevance_score in ranking:
+            original_idx, original_result = by_id[doc_id]
+            reranked.append(
+                RerankedResult(
+                    id=doc_id,
+                    text=original_result.text,
+                    original_score=original_result.score,
+                    rerank_score=relevance_score,
+                    original_rank=original_idx + 1,
+                    new_rank=len(reranked) + 1,
+                    metadata=original_result.metadata,
+                    source=original_result.source,
                 )
+            )
+        return reranked
+
+    def _store(self, cache_key: str, reranked: list[RerankedResult]) -> None:
+        """Cache the (id, relevance score) ranking of a successful rerank."""
+        self._cache.set(cache_key, [(r.id, r.rerank_score) for r in reranked])
+
+
+class AsyncReranker(Reranker):
+    """Non-blocking reranker that coalesces concurrent requests into batches.
+
+    Requests are queued and a background task drains up to ``max_batch_size`` of
+    them (waiting at most ``max_wait_ms`` after the first) before issuing their
+    Cohere calls concurrently on a shared ``cohere.AsyncClientV2``.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = "rerank-english-v3.0",
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        cache_size: int = 2048,
+        cache_ttl: float = 3600,
+    ):
+        super().__init__(api_key=api_key, model=model, cache_size=cache_size, cache_ttl=cache_ttl)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def client(self):
+        """Lazy load async Cohere client."""
+        if self._client is None:
+            if not self._api_key:
+                raise ValueError("Cohere API key not provided")
             
-            return reranked
-            
+            try:
+                import cohere
+                transport = httpx.AsyncHTTPTransport(
+                    retries=_HTTP_RETRIES, http2=HTTP2_AVAILABLE, limits=_HTTP_LIMITS
+                )
+                self._client = cohere.AsyncClientV2(
+                    api_key=self._api_key,
+                    httpx_client=httpx.AsyncClient(transport=transport, timeout=_HTTP_TIMEOUT),
+                )
+                logger.info("Cohere async client initialized")
+            except ImportError:
+                logger.error("Cohere not installed. Run: pip install cohere")
+                raise
+                
+        return self._client
+
+    async def rerank(
+        self,
+        query: str,
+        results: list,
+        top_k: int = 3,
+    ) -> list[RerankedResult]:
+        """Queue a rerank request and wait for its batch to complete."""
+        if not results:
+            return []
+        if settings.skip_rerank_when_small and len(results) <= top_k:
+            return _passthrough(results, top_k)
+
+        cached = self._from_cache(self._cache_key(query, results, top_k), results)
+        if cached is not None:
+            return cached
+
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, results, top_k, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Background loop: collect a batch, then rerank its items concurrently."""
+        while True:
+            batch = await self._collect()
+            # One failing item must not take down the loop (and every queued caller)
+            await asyncio.gather(*(self._process(*item) for item in batch), return_exceptions=True)
+
+    async def _collect(self) -> list[tuple]:
+        """Wait for one request, then gather more until the batch is full or times out."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _process(
+        self,
+        query: str,
+        results: list,
+        top_k: int,
+        future: asyncio.Future,
+    ) -> None:
+        """Run one Cohere rerank call and resolve the caller's future."""
+        reranked: list[RerankedResult] | None = None
+        error: Exception | None = None
+        try:
+            documents, groups = _prepare_documents(results)
+            response = await self.client.rerank(
+                model=self.model,
+                query=query,
+                documents=documents,
+                top_n=min(top_k, len(documents)),
+                return_documents=False,
+            )
+            reranked = _to_reranked(results, response.results, groups, top_k)
+            self._store(self._cache_key(query, results, top_k), reranked)
         except Exception as e:
             logger.error(f"Reranking failed: {e}")
-            return [
+            try:
+                reranked = _passthrough(results, top_k)
+            except Exception as passthrough_error:
+                error = passthrough_error
+        finally:
+            # Always settle the future, or rerank() would wait on it forever
+            if not future.done():
+                if reranked is not None:
+                    future.set_result(reranked)
+                elif error is not None:
+                    future.set_exception(error)
+                else:
+                    future.cancel()
+
+
+def _prepare_documents(results: list) -> tuple[list[str], list[list[int]]]:
+    """Truncate texts for the rerank model and drop duplicates.
+
+    Returns the unique documents plus, for each, the indices of the results that
+    share its text so rankings can be mapped back.
+    """
+    max_chars = settings.rerank_max_chars
+    positions: dict[str, list[int]] = {}
+    for idx, r in enumerate(results):
+        positions.setdefault(r.text[:max_chars], []).append(idx)
+    return list(positions), list(positions.values())
+
+
+def _to_reranked(
+    results: list,
+    ranked_items: list,
+    groups: list[list[int]],
+    top_k: int,
+) -> list[RerankedResult]:
+    """Map Cohere rerank items over deduplicated documents back onto the original results."""
+    reranked = []
+    for item in ranked_items:
+        for original_idx in groups[item.index]:
+            if len(reranked) == top_k:
+                return reranked
+            original_result = results[original_idx]
+            reranked.append(
                 RerankedResult(
-                    id=r.id,
-                    text=r.text,
-                    original_score=r.score,
-                    rerank_score=r.score,
-                    original_rank=i + 1,
-                    new_rank=i + 1,
-                    metadata=r.metadata,
-                    source=r.source,
+                    id=original_result.id,
+                    text=original_result.text,
+                    original_score=original_result.score,
+                    rerank_score=item.relevance_score,
+                    original_rank=original_idx + 1,
+                    new_rank=len(reranked) + 1,
+                    metadata=original_result.metadata,
+                    source=original_result.source,
                 )
-                for i, r in enumerate(results[:top_k])
-            ]
+            )
+
+    return reranked
+
+
+def _passthrough(results: list, top_k: int) -> list[RerankedResult]:
+    """Keep the original order when reranking is unavailable."""
+    return [
+        RerankedResult(
+            id=r.id,
+            text=r.text,
+            original_score=r.score,
+            rerank_score=r.score,
+            original_rank=i + 1,
+            new_rank=i + 1,
+            metadata=r.metadata,
+            source=r.source,
+        )
+        for i, r in enumerate(results[:top_k])
+    ]
 
 
 class MockReranker:
@@ -146,6 +371,7 @@ class MockReranker:
 
 
 _reranker = None
+_async_reranker: AsyncReranker | None = None
 
 
 def get_reranker(use_mock: bool = False, **kwargs):
@@ -158,3 +384,13 @@ def get_reranker(use_mock: bool = False, **kwargs):
     if _reranker is None:
         _reranker = Reranker(**kwargs)
     return _reranker
+
+
+def get_async_reranker(**kwargs) -> AsyncReranker:
+    """Get or create global async reranker instance."""
+    global _async_reranker
+    if _async_reranker is None:
+        kwargs.setdefault("max_batch_size", settings.rerank_batch_size)
+        kwargs.setdefault("max_wait_ms", settings.rerank_batch_wait_ms)
+        _async_reranker = AsyncReranker(**kwargs)
+    return _async_reranker
@@ -1,13 +1,46 @@
-"""Vector-based semantic search using ChromaDB."""
+"""Vector-based semantic search using ChromaDB or a FAISS index."""
 
+import asyncio
 import logging
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 import numpy as np
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+    faiss = None
+
+if FAISS_AVAILABLE:
+    faiss.omp_set_num_threads(settings.faiss_omp_threads or os.cpu_count() or 1)
+
+_SEMANTIC_EXECUTOR = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 4),
+    thread_name_prefix="semantic-search",
+)
+
+# Separate pool for per-source sub-queries so a search already running on
+# ``_SEMANTIC_EXECUTOR`` never waits on work queued behind it.
+_PARTITION_EXECUTOR = ThreadPoolExecutor(
+    max_workers=4,
+    thread_name_prefix="semantic-partition",
+)
+
+# Sources produced by the data loaders; unfiltered queries fan out over these.
+_PARTITION_SOURCES = ("faq", "fund")
+
 
 @dataclass
 class SemanticSearchResult:
@@ -20,6 +53,58 @@ class SemanticSearchResult:
     source: str
 
 
+# Exact types accepted as vector-store metadata values (None is excluded).
+_SCALAR_TYPES = frozenset({str, int, float, bool})
+
+
+def _document_metadata(doc: dict) -> dict[str, Any]:
+    """Flatten a document's source and scalar metadata into a vector-store metadata dict."""
+    return {
+        "source": doc.get("source", "unknown"),
+        **{k: v for k, v in doc.get("metadata", {}).items() if type(v) in _SCALAR_TYPES},
+    }
+
+
+class _SemanticQueryCache:
+    """Nearest-neighbour cache of search results keyed by normalized query embeddings.
+
+    Lookups are one matrix-vector product over the stored queries; when full, the
+    least-hit entry is replaced and hit counts are halved so old favourites age out.
+    """
+
+    def __init__(self, capacity: int, threshold: float):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors: np.ndarray | None = None
+        self._results: list[list[SemanticSearchResult]] = []
+        self._hits = np.zeros(capacity, dtype=np.int64)
+
+    def get(self, query: np.ndarray) -> list[SemanticSearchResult] | None:
+        """Return results of the most similar cached query if it clears the threshold."""
+        if not self._results:
+            return None
+        similarities = self._vectors[: len(self._results)] @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        self._hits[best] += 1
+        return self._results[best]
+
+    def put(self, query: np.ndarray, results: list[SemanticSearchResult]) -> None:
+        """Store results for a query, evicting the least frequently hit entry if full."""
+        if self._vectors is None:
+            self._vectors = np.empty((self.capacity, len(query)), dtype=np.float32)
+        if len(self._results) < self.capacity:
+            slot = len(self._results)
+            self._results.append(results)
+        else:
+            slot = int(np.argmin(self._hits))
+            self._results[slot] = results
+            self._hits //= 2
+        self._vectors[slot] = query
+        self._hits[slot] = 0
+
+
 class SemanticSearcher:
     """Semantic search using ChromaDB for in-process vector storage."""
 
@@ -27,12 +112,27 @@ class SemanticSearcher:
         self,
         collection_name: str = "qonfido_funds",
         persist_dir: str | None = None,
+        cache_size: int = 0,
+        cache_threshold: float = 0.95,
+        insert_batch_size: int = 250,
+        partition_sources: tuple[str, ...] | None = _PARTITION_SOURCES,
     ):
         self.collection_name = collection_name
         self.persist_dir = persist_dir
+        self.cache_size = cache_size
+        self.cache_threshold = cache_threshold
+        self.insert_batch_size = insert_batch_size
+        self.partition_sources = tuple(partition_sources or ())
         self._client = None
         self._collection = None
-        self._documents: dict[str, dict] = {}
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadatas: list[dict[str, Any]] = []
+        self._sources = np.empty(0, dtype=object)
+        self._id_to_row: dict[str, int] = {}
+        self._source_rows: dict[str, np.ndarray] = {}
+        self._query_caches: dict[tuple[int, str | None], _SemanticQueryCache] = {}
+        self._cache_lock = threading.Lock()
 
     def _initialize(self):
         """Initialize ChromaDB client and collection (lazy initialization)."""
@@ -64,6 +164,59 @@ class SemanticSearcher:
             logger.error("ChromaDB not installed. Run: pip install chromadb")
             raise
 
+    def _store_documents(
+        self,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Append document columns and extend the id and per-source row lookups."""
+        start = len(self._ids)
+        self._ids.extend(ids)
+        self._texts.extend(texts)
+        self._metadatas.extend(metadatas)
+        sources = np.array([meta["source"] for meta in metadatas], dtype=object)
+        self._sources = np.concatenate([self._sources, sources])
+        self._id_to_row.update(zip(ids, range(start, start + len(ids))))
+        for source in set(sources):
+            new_rows = start + np.flatnonzero(sources == source)
+            existing = self._source_rows.get(source)
+            self._source_rows[source] = (
+                new_rows if existing is None else np.concatenate([existing, new_rows])
+            )
+
+    def _reset_documents(self) -> None:
+        """Drop all document columns."""
+        self._ids = []
+        self._texts = []
+        self._metadatas = []
+        self._sources = np.empty(0, dtype=object)
+        self._id_to_row = {}
+        self._source_rows = {}
+
+    def get_document(self, doc_id: str) -> dict[str, Any] | None:
+        """Get an indexed document by id."""
+        row = self._id_to_row.get(doc_id)
+        if row is None:
+            return None
+        return {
+            "id": self._ids[row],
+            "text": self._texts[row],
+            "source": self._sources[row],
+            "metadata": self._metadatas[row],
+        }
+
+    def attach_documents(self, documents: list[dict]) -> None:
+        """Load the document columns for an already-populated persistent store."""
+        self._initialize()
+        if self._ids:
+            return
+        self._store_documents(
+            [doc["id"] for doc in documents],
+            [doc["text"] for doc in documents],
+            [_document_metadata(doc) for doc in documents],
+        )
+
     def index_documents(
         self,
         documents: list[dict],
@@ -77,27 +230,23 @@ class SemanticSearcher:
 
         logger.info(f"Indexing {len(documents)} documents for semantic search...")
 
-        for doc in documents:
-            self._documents[doc["id"]] = doc
-
         ids = [doc["id"] for doc in documents]
         texts = [doc["text"] for doc in documents]
-        metadatas = []
-        
-        for doc in documents:
-            meta = {"source": doc.get("source", "unknown")}
-            if "metadata" in doc:
-                for k, v in doc["metadata"].items():
-                    if v is not None and isinstance(v, (str, int, float, bool)):
-                        meta[k] = v
-            metadatas.append(meta)
-
-        self._collection.add(
-            ids=ids,
-            embeddings=embeddings.tolist(),
-            documents=texts,
-            metadatas=metadatas,
-        )
+        metadatas = [_document_metadata(doc) for doc in documents]
+        self._store_documents(ids, texts, metadatas)
+        self.clear_cache()
+
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        batch_size = self.insert_batch_size
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self._collection.add(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+            )
+            logger.debug("Added %d/%d documents to ChromaDB", min(end, len(ids)), len(ids))
         
         logger.info(f"Indexed {len(documents)} documents")
 
@@ -107,42 +256,156 @@ class SemanticSearcher:
         top_k: int = 5,
         source_filter: str | None = None,
     ) -> list[SemanticSearchResult]:
-        """Search for similar documents using cosine similarity."""
+        """Search for similar documents using cosine similarity.
+
+        Results are cached per (top_k, source_filter); a query whose embedding has
+        cosine similarity >= ``cache_threshold`` with a cached one reuses its results.
+        """
         self._initialize()
         
-        if self._collection.count() == 0:
+        if self.document_count == 0:
             logger.warning("Collection is empty")
             return []
 
-        where = None
+        cache = None
+        normalized = None
+        if self.cache_size:
+            query = np.asarray(query_embedding, dtype=np.float32).ravel()
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                normalized = query / norm
+                with self._cache_lock:
+                    cache = self._query_caches.get((top_k, source_filter))
+                    if cache is None:
+                        cache = _SemanticQueryCache(self.cache_size, self.cache_threshold)
+                        self._query_caches[(top_k, source_filter)] = cache
+                    cached = cache.get(normalized)
+                if cached is not None:
+                    return list(cached)
+
+        search_results = self._query(query_embedding, top_k, source_filter)
+
+        if cache is not None:
+            with self._cache_lock:
+                cache.put(normalized, search_results)
+
+        return list(search_results)
+
+    def _query(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        source_filter: str | None,
+    ) -> list[SemanticSearchResult]:
+        """Run an uncached nearest-neighbour query against ChromaDB."""
         if source_filter:
-            where = {"source": source_filter}
+            return self._query_collection(
+                query_embedding, top_k, {"source": source_filter}
+            )
+
+        partitions = self._partitions()
+        if len(partitions) < 2:
+            return self._query_collection(query_embedding, top_k, None)
+
+        # One filtered query per source; the last runs on this thread.
+        futures = [
+            _PARTITION_EXECUTOR.submit(
+                self._query_collection, query_embedding, top_k, {"source": source}
+            )
+            for source in partitions[:-1]
+        ]
+        merged = self._query_collection(
+            query_embedding, top_k, {"source": partitions[-1]}
+        )
+        for future in futures:
+            merged.extend(future.result())
+        merged.sort(key=lambda r: r.score, reverse=True)
+        return merged[:top_k]
+
+    def _partitions(self) -> tuple[str, ...]:
+        """Sources to fan an unfiltered query over, or () if some are unknown."""
+        if not self.partition_sources:
+            return ()
+        if not set(self._source_rows).issubset(self.partition_sources):
+            return ()
+        if self._source_rows:
+            return tuple(s for s in self.partition_sources if s in self._source_rows)
+        return self.partition_sources
 
+    def _query_collection(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        where: dict[str, Any] | None,
+    ) -> list[SemanticSearchResult]:
+        """Run a single ChromaDB query and convert its rows to results.
+
+        Only ids and distances are fetched; texts and metadata come from the local
+        document columns, with one ``get`` for any ids not held locally.
+        """
         results = self._collection.query(
-            query_embeddings=[query_embedding.tolist()],
+            query_embeddings=np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
             n_results=top_k,
             where=where,
-            include=["documents", "metadatas", "distances"],
+            include=["distances"],
         )
+        if not results["ids"] or not results["ids"][0]:
+            return []
+
+        ids = results["ids"][0]
+        if results["distances"]:
+            scores = (1.0 - np.asarray(results["distances"][0], dtype=np.float64)).tolist()
+        else:
+            scores = [1.0] * len(ids)
+        missing = [doc_id for doc_id in ids if doc_id not in self._id_to_row]
+        fetched = self._fetch_documents(missing) if missing else {}
 
         search_results = []
-        if results["ids"] and results["ids"][0]:
-            for i, doc_id in enumerate(results["ids"][0]):
-                distance = results["distances"][0][i] if results["distances"] else 0
-                score = 1 - distance
-                
-                search_results.append(
-                    SemanticSearchResult(
-                        id=doc_id,
-                        text=results["documents"][0][i] if results["documents"] else "",
-                        score=float(score),
-                        metadata=results["metadatas"][0][i] if results["metadatas"] else {},
-                        source=results["metadatas"][0][i].get("source", "unknown") if results["metadatas"] else "unknown",
-                    )
+        for doc_id, score in zip(ids, scores):
+            row = self._id_to_row.get(doc_id)
+            if row is not None:
+                text, metadata = self._texts[row], self._metadatas[row]
+            else:
+                text, metadata = fetched.get(doc_id, ("", {}))
+            search_results.append(
+                SemanticSearchResult(
+                    id=doc_id,
+                    text=text,
+                    score=score,
+                    metadata=metadata,
+                    source=metadata.get("source", "unknown"),
                 )
+            )
 
         return search_results
 
+    def _fetch_documents(self, ids: list[str]) -> dict[str, tuple[str, dict[str, Any]]]:
+        """Fetch texts and metadata for ids that are not in the local columns."""
+        got = self._collection.get(ids=ids, include=["documents", "metadatas"])
+        documents = got.get("documents") or [""] * len(got["ids"])
+        metadatas = got.get("metadatas") or [{}] * len(got["ids"])
+        return {
+            doc_id: (text or "", metadata or {})
+            for doc_id, text, metadata in zip(got["ids"], documents, metadatas)
+        }
+
+    async def asearch(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 5,
+        source_filter: str | None = None,
+    ) -> list[SemanticSearchResult]:
+        """Run ``search`` on the semantic executor so the event loop is not blocked."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _SEMANTIC_EXECUTOR, self.search, query_embedding, top_k, source_filter
+        )
+
+    def clear_cache(self) -> None:
+        """Drop all cached query results."""
+        with self._cache_lock:
+            self._query_caches.clear()
+
     @property
     def document_count(self) -> int:
         """Get number of indexed documents."""
@@ -157,16 +420,219 @@ class SemanticSearcher:
             name=self.collection_name,
             metadata={"hnsw:space": "cosine"},
         )
-        self._documents.clear()
+        self._reset_documents()
+        self.clear_cache()
+        logger.info("Collection cleared")
+
+
+class FAISSSemanticSearcher(SemanticSearcher):
+    """Exact semantic search over a flat inner-product index of normalized embeddings.
+
+    Uses ``faiss.IndexFlatIP`` when faiss is installed and a NumPy matrix product
+    otherwise; both are exact, which for corpora well under 1M vectors is as good
+    as HNSW and faster to build. The document columns are persisted next to the
+    index under ``persist_dir``.
+    """
+
+    _store_dir = "faiss"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._index = None
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._loaded = False
+
+    @property
+    def _store_path(self) -> Path | None:
+        return Path(self.persist_dir) / self._store_dir / self.collection_name if self.persist_dir else None
+
+    def _new_index(self, dim: int):
+        """Create an empty faiss index for ``dim``-dimensional vectors."""
+        return faiss.IndexFlatIP(dim)
+
+    def _search_params(self, rows: np.ndarray | None):
+        """Faiss search parameters restricting the query to ``rows`` when given."""
+        if rows is None:
+            return None
+        return faiss.SearchParameters(sel=faiss.IDSelectorBatch(rows))
+
+    def _initialize(self):
+        """Load a persisted index on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        store_path = self._store_path
+        if store_path is None or not (store_path / "documents.pkl").exists():
+            return
+
+        with open(store_path / "documents.pkl", "rb") as f:
+            ids, texts, metadatas = pickle.load(f)
+        if FAISS_AVAILABLE:
+            self._index = faiss.read_index(str(store_path / "vectors.index"))
+        else:
+            self._embeddings = np.load(store_path / "vectors.npy")
+        self._store_documents(ids, texts, metadatas)
+        logger.info("FAISS index loaded: %d documents", len(ids))
+
+    def index_documents(
+        self,
+        documents: list[dict],
+        embeddings: np.ndarray,
+    ) -> None:
+        """Add documents to the flat index and persist it."""
+        if len(documents) != len(embeddings):
+            raise ValueError("Documents and embeddings count mismatch")
+
+        self._initialize()
+        logger.info("Indexing %d documents for semantic search...", len(documents))
+
+        embeddings = np.array(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms > 0, norms, 1.0)
+
+        if FAISS_AVAILABLE:
+            if self._index is None:
+                self._index = self._new_index(embeddings.shape[1])
+            self._index.add(embeddings)
+        elif len(self._embeddings):
+            self._embeddings = np.vstack([self._embeddings, embeddings])
+        else:
+            self._embeddings = embeddings
+
+        self._store_documents(
+            [doc["id"] for doc in documents],
+            [doc["text"] for doc in documents],
+            [_document_metadata(doc) for doc in documents],
+        )
+        self.clear_cache()
+        self._save()
+        logger.info("Indexed %d documents", len(documents))
+
+    def _save(self) -> None:
+        """Persist the index and document columns if a persist dir is configured."""
+        store_path = self._store_path
+        if store_path is None:
+            return
+        store_path.mkdir(parents=True, exist_ok=True)
+        if FAISS_AVAILABLE:
+            faiss.write_index(self._index, str(store_path / "vectors.index"))
+        else:
+            np.save(store_path / "vectors.npy", self._embeddings)
+        with open(store_path / "documents.pkl", "wb") as f:
+            pickle.dump((self._ids, self._texts, self._metadatas), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _query(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        source_filter: str | None,
+    ) -> list[SemanticSearchResult]:
+        """Run an exact inner-product query, optionally restricted to one source."""
+        rows = None
+        if source_filter:
+            rows = self._source_rows.get(source_filter)
+            if rows is None:
+                return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        k = min(top_k, len(self._ids) if rows is None else len(rows))
+
+        if FAISS_AVAILABLE:
+            scores, indices = self._index.search(query, k, params=self._search_params(rows))
+            scores, indices = scores[0], indices[0]
+            keep = indices >= 0
+            scores, indices = scores[keep], indices[keep]
+        else:
+            candidates = np.arange(len(self._ids)) if rows is None else rows
+            candidate_scores = self._embeddings[candidates] @ query[0]
+            top = np.argpartition(-candidate_scores, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+            top = top[np.argsort(-candidate_scores[top], kind="stable")]
+            scores, indices = candidate_scores[top], candidates[top]
+
+        return [
+            SemanticSearchResult(
+                id=self._ids[row],
+                text=self._texts[row],
+                score=float(score),
+                metadata=self._metadatas[row],
+                source=self._sources[row],
+            )
+            for row, score in zip(indices.tolist(), scores.tolist())
+        ]
+
+    @property
+    def document_count(self) -> int:
+        """Get number of indexed documents."""
+        self._initialize()
+        return len(self._ids)
+
+    def clear(self) -> None:
+        """Clear all documents from the index and its persisted files."""
+        self._loaded = True
+        self._index = None
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._reset_documents()
+        self.clear_cache()
+        store_path = self._store_path
+        if store_path is not None:
+            for name in ("vectors.index", "vectors.npy", "documents.pkl"):
+                (store_path / name).unlink(missing_ok=True)
         logger.info("Collection cleared")
 
 
+class FAISSHNSWSemanticSearcher(FAISSSemanticSearcher):
+    """Approximate semantic search over a faiss HNSW graph (``IndexHNSWFlat``).
+
+    Trades a little recall for sub-linear query time on large corpora. Falls back
+    to the exact NumPy path when faiss is not installed.
+    """
+
+    _store_dir = "faiss_hnsw"
+
+    def __init__(
+        self,
+        *args,
+        hnsw_m: int = 32,
+        ef_construction: int = 40,
+        ef_search: int = 64,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+
+    def _new_index(self, dim: int):
+        """Create an empty inner-product HNSW index."""
+        index = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = self.ef_construction
+        index.hnsw.efSearch = self.ef_search
+        return index
+
+    def _search_params(self, rows: np.ndarray | None):
+        """HNSW search parameters carrying ``ef_search`` and an optional row filter."""
+        params = faiss.SearchParametersHNSW(efSearch=max(self.ef_search, 1))
+        if rows is not None:
+            params.sel = faiss.IDSelectorBatch(rows)
+        return params
+
+
 _semantic_searcher: SemanticSearcher | None = None
 
 
-def get_semantic_searcher(**kwargs) -> SemanticSearcher:
-    """Get or create global semantic searcher instance."""
+def get_semantic_searcher(backend: str | None = None, **kwargs) -> SemanticSearcher:
+    """Get or create global semantic searcher instance for the configured backend."""
     global _semantic_searcher
     if _semantic_searcher is None:
-        _semantic_searcher = SemanticSearcher(**kwargs)
+        backend = backend or settings.vector_backend
+        if backend == "faiss":
+            _semantic_searcher = FAISSSemanticSearcher(**kwargs)
+        elif backend == "faiss_hnsw":
+            _semantic_searcher = FAISSHNSWSemanticSearcher(**kwargs)
+        else:
+            _semantic_searcher = SemanticSearcher(**kwargs)
     return _semantic_searcher
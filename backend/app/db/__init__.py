@@ -1,9 +1,18 @@
 """Database models, sessions, and repositories."""
 
 from app.db.models import FAQ, Fund, QueryLog, EmbeddingCache
-from app.db.repositories import FAQRepository, FundRepository, QueryLogRepository
+from app.db.query_log_writer import QueryLogWriter, get_query_log_writer
+from app.db.repositories import (
+    EmbeddingCacheRepository,
+    FAQRepository,
+    FundRepository,
+    QueryLogRepository,
+    clear_leaderboard_cache,
+    get_embedding_memory_stats,
+)
 from app.db.session import (
     DatabaseManager,
+    count_queries,
     get_db_manager,
     get_session,
     init_db,
@@ -15,10 +24,16 @@ __all__ = [
     "QueryLog",
     "EmbeddingCache",
     "DatabaseManager",
+    "count_queries",
     "get_db_manager",
     "get_session",
     "init_db",
     "FundRepository",
     "FAQRepository",
     "QueryLogRepository",
+    "EmbeddingCacheRepository",
+    "get_embedding_memory_stats",
+    "clear_leaderboard_cache",
+    "QueryLogWriter",
+    "get_query_log_writer",
 ]
@@ -1,10 +1,25 @@
 """SQLModel models for database tables."""
 
-from datetime import datetime
+import hashlib
+from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
+from sqlalchemy import BigInteger, DateTime, Index, func
 from sqlmodel import Field, SQLModel
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    xxhash = None
+
+
+def utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
 
 class FundBase(SQLModel):
     """Base model for fund data."""
@@ -35,11 +50,25 @@ class Fund(FundBase, table=True):
     """Fund database table."""
 
     __tablename__ = "funds"
+    __table_args__ = (
+        Index("ix_funds_category_risk_level_cagr_3yr", "category", "risk_level", "cagr_3yr"),
+    )
     
     id: int | None = Field(default=None, primary_key=True)
     external_id: str = Field(..., unique=True, index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+
+
+# Partial descending indexes serving the top-N leaderboards straight from index order.
+for _column in (Fund.sharpe_ratio, Fund.cagr_1yr, Fund.cagr_3yr, Fund.cagr_5yr):
+    Index(
+        f"ix_funds_{_column.key}_desc",
+        _column.desc(),
+        postgresql_where=_column.isnot(None),
+        sqlite_where=_column.isnot(None),
+    )
+del _column
 
 
 class FAQBase(SQLModel):
@@ -57,7 +86,7 @@ class FAQ(FAQBase, table=True):
     
     id: int | None = Field(default=None, primary_key=True)
     external_id: str = Field(..., unique=True, index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
 
 
 class QueryLogBase(SQLModel):
@@ -75,9 +104,17 @@ class QueryLog(QueryLogBase, table=True):
     """Query log database table for analytics."""
 
     __tablename__ = "query_logs"
+    __table_args__ = (
+        Index("ix_query_logs_created_at_search_mode", "created_at", "search_mode"),
+        Index("ix_query_logs_created_at_id", "created_at", "id"),
+    )
     
     id: int | None = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(
+        default_factory=utcnow,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()},
+    )
     user_id: str | None = None
     session_id: str | None = None
 
@@ -85,10 +122,52 @@ class QueryLog(QueryLogBase, table=True):
 class EmbeddingCache(SQLModel, table=True):
     """Cache for embeddings to avoid recomputation."""
 
-    __tablename__ = "embedding_cache"
+    # Renamed from "embedding_cache" when text_hash became BIGINT: create_all never
+    # alters existing tables, so a new name is what gets the new schema built.
+    __tablename__ = "embedding_cache_v2"
     
     id: int | None = Field(default=None, primary_key=True)
-    text_hash: str = Field(..., unique=True, index=True)
+    text_hash: int = Field(..., unique=True, index=True, sa_type=BigInteger)
     embedding: bytes
+    scale: float = 1.0
     model_name: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+
+    @staticmethod
+    def hash_text(text: str) -> int:
+        """64-bit signed key for ``text`` (xxh3 when available, else blake2b)."""
+        if XXHASH_AVAILABLE:
+            digest = xxhash.xxh3_64_digest(text.encode())
+        else:
+            digest = hashlib.blake2b(text.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    @classmethod
+    def from_embedding(
+        cls,
+        text_hash: int,
+        embedding: np.ndarray,
+        model_name: str,
+    ) -> "EmbeddingCache":
+        """Build a row storing the embedding as offset uint8 with a per-row scale."""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        scale = float(np.abs(embedding).max()) / 127 if embedding.size else 0.0
+        scale = scale or 1.0
+        quantized = np.clip(np.round(embedding / scale + 128), 0, 255).astype(np.uint8)
+        return cls(
+            text_hash=text_hash,
+            embedding=quantized.tobytes(),
+            scale=scale,
+            model_name=model_name,
+        )
+
+    def load_embedding(self, dimension: int) -> np.ndarray | None:
+        """Dequantize the stored embedding back to float32.
+
+        Returns None for rows not in the one-byte-per-dimension format (e.g. raw
+        float32 blobs), so callers treat them as misses and re-encode on upsert.
+        """
+        if len(self.embedding) != dimension:
+            return None
+        quantized = np.frombuffer(self.embedding, dtype=np.uint8)
+        return (quantized.astype(np.float32) - 128) * np.float32(self.scale)
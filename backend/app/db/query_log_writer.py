@@ -0,0 +1,109 @@
+"""Background batching writer for query analytics logs."""
+
+import asyncio
+import logging
+
+from sqlalchemy import insert
+
+from app.db.models import QueryLog
+from app.db.session import get_db_manager
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLogWriter:
+    """Buffers QueryLog rows in a queue and commits them in batches off the request path."""
+
+    def __init__(
+        self,
+        max_batch_size: int = 500,
+        flush_interval: float = 0.1,
+        max_queue_size: int = 10_000,
+    ):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher is active."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._flusher())
+        logger.info("Query log writer started")
+
+    def enqueue(self, entry: QueryLog) -> None:
+        """Queue a log entry without waiting; drops it when the writer is stopped or full."""
+        if not self.running:
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            logger.warning("Query log queue full, dropping entry")
+
+    async def shutdown(self) -> None:
+        """Flush everything queued so far and stop the flusher."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("Query log writer stopped")
+
+    async def _flusher(self) -> None:
+        """Background loop: collect a batch, then write it in one transaction."""
+        while True:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._write(batch)
+            if stopping:
+                return
+
+    async def _collect(self) -> tuple[list[QueryLog], bool]:
+        """Wait for one entry, then gather more until the batch is full or the interval ends."""
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    async def _write(self, batch: list[QueryLog]) -> None:
+        """Insert a batch of log entries as one executemany INSERT and a single commit."""
+        rows = [entry.model_dump(exclude={"id"}) for entry in batch]
+        try:
+            async with get_db_manager().async_session_maker() as session:
+                await session.execute(insert(QueryLog), rows)
+                await session.commit()
+        except Exception as e:
+            logger.warning("Failed to write %d query log entries: %s", len(batch), e)
+
+
+_query_log_writer: QueryLogWriter | None = None
+
+
+def get_query_log_writer() -> QueryLogWriter:
+    """Get or create the global query log writer."""
+    global _query_log_writer
+    if _query_log_writer is None:
+        _query_log_writer = QueryLogWriter()
+    return _query_log_writer
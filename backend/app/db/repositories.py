@@ -1,16 +1,129 @@
 """Data access layer for database operations."""
 
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any
 
+import numpy as np
+from sqlalchemy import bindparam, func, insert, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.db.models import FAQ, Fund, QueryLog
+from app.config import settings
+from app.db.models import FAQ, EmbeddingCache, Fund, QueryLog
 
 logger = logging.getLogger(__name__)
 
+_EMBEDDING_MEMORY_SIZE = 10_000
+_embedding_memory: OrderedDict[int, np.ndarray] = OrderedDict()
+_embedding_memory_lock = threading.Lock()
+_embedding_memory_stats = {"hits": 0, "misses": 0}
+
+
+_COPY_THRESHOLD = 100
+
+# Short-lived cache of fund leaderboards: (metric, limit) -> (expires_at, funds).
+_leaderboard_cache: dict[tuple[str, int], tuple[float, list[Fund]]] = {}
+_leaderboard_lock = threading.Lock()
+
+
+def _cached_leaderboard(key: tuple[str, int]) -> list[Fund] | None:
+    """Return a fresh cached leaderboard, or None."""
+    with _leaderboard_lock:
+        entry = _leaderboard_cache.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return list(entry[1])
+
+
+def _store_leaderboard(key: tuple[str, int], funds: list[Fund]) -> None:
+    """Cache a leaderboard for ``settings.leaderboard_cache_ttl`` seconds."""
+    if settings.leaderboard_cache_ttl <= 0:
+        return
+    with _leaderboard_lock:
+        _leaderboard_cache[key] = (time.monotonic() + settings.leaderboard_cache_ttl, list(funds))
+
+
+def clear_leaderboard_cache() -> None:
+    """Drop cached fund leaderboards, e.g. after funds change."""
+    with _leaderboard_lock:
+        _leaderboard_cache.clear()
+
+# Hot point lookups, built once so each call reuses the statement and its cache key.
+_FUND_BY_EXTERNAL_ID = select(Fund).where(Fund.external_id == bindparam("external_id"))
+_FAQ_BY_EXTERNAL_ID = select(FAQ).where(FAQ.external_id == bindparam("external_id"))
+_EMBEDDING_BY_HASH = select(EmbeddingCache).where(EmbeddingCache.text_hash == bindparam("text_hash"))
+
+
+async def _bulk_insert(session: AsyncSession, model: type, rows: list[dict[str, Any]]) -> list:
+    """Insert rows of ``model``, skipping external ids that already exist.
+
+    Returns the newly stored objects in input order. Large batches on asyncpg are
+    COPYed into a temporary staging table and moved over with one
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING; everything else is a single
+    executemany INSERT ... ON CONFLICT DO NOTHING RETURNING.
+    """
+    records = [model(**data).model_dump(exclude={"id"}) for data in rows]
+    if not records:
+        return []
+
+    dialect = session.bind.dialect
+    if len(records) >= _COPY_THRESHOLD and dialect.driver == "asyncpg":
+        return await _copy_insert(session, model, records)
+
+    if dialect.name == "postgresql":
+        statement = postgresql_insert(model)
+    elif dialect.name == "sqlite":
+        statement = sqlite_insert(model)
+    else:
+        statement = insert(model)
+    if dialect.name in ("postgresql", "sqlite"):
+        statement = statement.on_conflict_do_nothing(index_elements=["external_id"])
+
+    result = await session.execute(statement.returning(model), records)
+    inserted = {obj.external_id: obj for obj in result.scalars().all()}
+    await session.commit()
+    return [inserted.pop(r["external_id"]) for r in records if r["external_id"] in inserted]
+
+
+async def _copy_insert(session: AsyncSession, model: type, records: list[dict[str, Any]]) -> list:
+    """COPY records into a staging table, then insert the non-conflicting ones."""
+    table = model.__tablename__
+    staging = f"_{table}_staging"
+    columns = list(records[0])
+    column_list = ", ".join(columns)
+
+    await session.execute(
+        text(f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+    )
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        staging,
+        records=[tuple(record[c] for c in columns) for record in records],
+        columns=columns,
+    )
+    result = await session.execute(
+        text(
+            f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+            "ON CONFLICT (external_id) DO NOTHING RETURNING id"
+        )
+    )
+    inserted_ids = list(result.scalars().all())
+    await session.commit()
+    if not inserted_ids:
+        return []
+
+    result = await session.execute(select(model).where(model.id.in_(inserted_ids)))
+    inserted = {obj.external_id: obj for obj in result.scalars().all()}
+    return [inserted.pop(r["external_id"]) for r in records if r["external_id"] in inserted]
+
 
 class FundRepository:
     """Repository for Fund database operations."""
@@ -23,7 +136,7 @@ class FundRepository:
         fund = Fund(**fund_data)
         self.session.add(fund)
         await self.session.commit()
-        await self.session.refresh(fund)
+        clear_leaderboard_cache()
         return fund
 
     async def get_by_id(self, fund_id: int) -> Fund | None:
@@ -32,13 +145,22 @@ class FundRepository:
 
     async def get_by_external_id(self, external_id: str) -> Fund | None:
         """Get fund by external ID."""
-        statement = select(Fund).where(Fund.external_id == external_id)
-        result = await self.session.execute(statement)
+        result = await self.session.execute(_FUND_BY_EXTERNAL_ID, {"external_id": external_id})
         return result.scalar_one_or_none()
 
-    async def get_all(self, limit: int = 100, offset: int = 0) -> list[Fund]:
-        """Get all funds with pagination."""
-        statement = select(Fund).offset(offset).limit(limit)
+    async def get_by_external_ids(self, external_ids: list[str]) -> dict[str, Fund]:
+        """Get funds for several external IDs in one query, keyed by external ID."""
+        if not external_ids:
+            return {}
+        statement = select(Fund).where(Fund.external_id.in_(set(external_ids)))
+        result = await self.session.execute(statement)
+        return {row.external_id: row for row in result.scalars().all()}
+
+    async def get_all(self, limit: int = 100, after_id: int | None = None) -> list[Fund]:
+        """Get funds ordered by ID, one keyset page at a time (pass the last ID seen)."""
+        statement = select(Fund).order_by(Fund.id).limit(limit)
+        if after_id is not None:
+            statement = statement.where(Fund.id > after_id)
         result = await self.session.execute(statement)
         return list(result.scalars().all())
 
@@ -55,7 +177,10 @@ class FundRepository:
         return list(result.scalars().all())
 
     async def get_top_by_sharpe(self, limit: int = 10) -> list[Fund]:
-        """Get top funds by Sharpe ratio."""
+        """Get top funds by Sharpe ratio (cached briefly)."""
+        cached = _cached_leaderboard(("sharpe_ratio", limit))
+        if cached is not None:
+            return cached
         statement = (
             select(Fund)
             .where(Fund.sharpe_ratio.isnot(None))
@@ -63,10 +188,12 @@ class FundRepository:
             .limit(limit)
         )
         result = await self.session.execute(statement)
-        return list(result.scalars().all())
+        funds = list(result.scalars().all())
+        _store_leaderboard(("sharpe_ratio", limit), funds)
+        return funds
 
     async def get_top_by_cagr(self, years: int = 3, limit: int = 10) -> list[Fund]:
-        """Get top funds by CAGR for specified years."""
+        """Get top funds by CAGR for specified years (cached briefly)."""
         if years == 1:
             column = Fund.cagr_1yr
         elif years == 5:
@@ -74,6 +201,10 @@ class FundRepository:
         else:
             column = Fund.cagr_3yr
 
+        cached = _cached_leaderboard((column.key, limit))
+        if cached is not None:
+            return cached
+
         statement = (
             select(Fund)
             .where(column.isnot(None))
@@ -81,22 +212,21 @@ class FundRepository:
             .limit(limit)
         )
         result = await self.session.execute(statement)
-        return list(result.scalars().all())
+        funds = list(result.scalars().all())
+        _store_leaderboard((column.key, limit), funds)
+        return funds
 
     async def bulk_create(self, funds_data: list[dict[str, Any]]) -> list[Fund]:
-        """Bulk create fund records."""
-        funds = [Fund(**data) for data in funds_data]
-        self.session.add_all(funds)
-        await self.session.commit()
-        for fund in funds:
-            await self.session.refresh(fund)
+        """Bulk create fund records, skipping external IDs that already exist."""
+        funds = await _bulk_insert(self.session, Fund, funds_data)
+        clear_leaderboard_cache()
         return funds
 
     async def count(self) -> int:
         """Get total fund count."""
-        statement = select(Fund)
+        statement = select(func.count()).select_from(Fund)
         result = await self.session.execute(statement)
-        return len(list(result.scalars().all()))
+        return result.scalar_one()
 
 
 class FAQRepository:
@@ -110,7 +240,6 @@ class FAQRepository:
         faq = FAQ(**faq_data)
         self.session.add(faq)
         await self.session.commit()
-        await self.session.refresh(faq)
         return faq
 
     async def get_by_id(self, faq_id: int) -> FAQ | None:
@@ -119,13 +248,22 @@ class FAQRepository:
 
     async def get_by_external_id(self, external_id: str) -> FAQ | None:
         """Get FAQ by external ID."""
-        statement = select(FAQ).where(FAQ.external_id == external_id)
-        result = await self.session.execute(statement)
+        result = await self.session.execute(_FAQ_BY_EXTERNAL_ID, {"external_id": external_id})
         return result.scalar_one_or_none()
 
-    async def get_all(self, limit: int = 100, offset: int = 0) -> list[FAQ]:
-        """Get all FAQs with pagination."""
-        statement = select(FAQ).offset(offset).limit(limit)
+    async def get_by_external_ids(self, external_ids: list[str]) -> dict[str, FAQ]:
+        """Get FAQs for several external IDs in one query, keyed by external ID."""
+        if not external_ids:
+            return {}
+        statement = select(FAQ).where(FAQ.external_id.in_(set(external_ids)))
+        result = await self.session.execute(statement)
+        return {row.external_id: row for row in result.scalars().all()}
+
+    async def get_all(self, limit: int = 100, after_id: int | None = None) -> list[FAQ]:
+        """Get FAQs ordered by ID, one keyset page at a time (pass the last ID seen)."""
+        statement = select(FAQ).order_by(FAQ.id).limit(limit)
+        if after_id is not None:
+            statement = statement.where(FAQ.id > after_id)
         result = await self.session.execute(statement)
         return list(result.scalars().all())
 
@@ -136,19 +274,14 @@ class FAQRepository:
         return list(result.scalars().all())
 
     async def bulk_create(self, faqs_data: list[dict[str, Any]]) -> list[FAQ]:
-        """Bulk create FAQ records."""
-        faqs = [FAQ(**data) for data in faqs_data]
-        self.session.add_all(faqs)
-        await self.session.commit()
-        for faq in faqs:
-            await self.session.refresh(faq)
-        return faqs
+        """Bulk create FAQ records, skipping external IDs that already exist."""
+        return await _bulk_insert(self.session, FAQ, faqs_data)
 
     async def count(self) -> int:
         """Get total FAQ count."""
-        statement = select(FAQ)
+        statement = select(func.count()).select_from(FAQ)
         result = await self.session.execute(statement)
-        return len(list(result.scalars().all()))
+        return result.scalar_one()
 
 
 class QueryLogRepository:
@@ -167,8 +300,13 @@ class QueryLogRepository:
         confidence: float | None = None,
         user_id: str | None = None,
         session_id: str | None = None,
+        commit: bool = True,
     ) -> QueryLog:
-        """Log a query for analytics."""
+        """Log a query for analytics.
+
+        With ``commit=False`` the entry is only added to the session, so an outer
+        ``session_scope`` can commit it together with the rest of the request.
+        """
         log = QueryLog(
             query=query,
             search_mode=search_mode,
@@ -179,51 +317,207 @@ class QueryLogRepository:
             user_id=user_id,
             session_id=session_id,
         )
-        self.session.add(log)
+        if not commit:
+            self.session.add(log)
+            return log
+
+        statement = insert(QueryLog).values(**log.model_dump(exclude={"id"})).returning(QueryLog)
+        result = await self.session.execute(statement)
+        log = result.scalar_one()
         await self.session.commit()
-        await self.session.refresh(log)
         return log
 
-    async def get_recent(self, limit: int = 100) -> list[QueryLog]:
-        """Get recent query logs."""
+    async def get_recent(
+        self,
+        limit: int = 100,
+        before: tuple[datetime, int] | None = None,
+    ) -> list[QueryLog]:
+        """Get recent query logs, newest first.
+
+        Pass the ``(created_at, id)`` of the last log of a page as ``before`` to get
+        the next page.
+        """
         statement = (
             select(QueryLog)
-            .order_by(QueryLog.created_at.desc())
+            .order_by(QueryLog.created_at.desc(), QueryLog.id.desc())
             .limit(limit)
         )
+        if before is not None:
+            statement = statement.where(tuple_(QueryLog.created_at, QueryLog.id) < tuple_(*before))
         result = await self.session.execute(statement)
         return list(result.scalars().all())
 
     async def get_stats(self) -> dict[str, Any]:
-        """Get query statistics."""
-        result = await self.session.execute(select(QueryLog))
-        logs = list(result.scalars().all())
-        
-        if not logs:
-            return {
-                "total_queries": 0,
-                "avg_response_time_ms": None,
-                "avg_confidence": None,
-                "search_mode_distribution": {},
-                "query_type_distribution": {},
-            }
-
-        total = len(logs)
-        response_times = [l.response_time_ms for l in logs if l.response_time_ms]
-        confidences = [l.confidence for l in logs if l.confidence]
-        
-        search_modes = {}
-        query_types = {}
-        
-        for log in logs:
-            search_modes[log.search_mode] = search_modes.get(log.search_mode, 0) + 1
-            if log.query_type:
-                query_types[log.query_type] = query_types.get(log.query_type, 0) + 1
+        """Get query statistics, aggregated in the database in one round-trip."""
+        result = await self.session.execute(select(*self._stats_columns()))
+        return _stats_from_row(result.one())
 
+    async def dashboard(self, limit: int = 20) -> dict[str, Any]:
+        """Get query statistics plus the most recent logs in a single query."""
+        statement = (
+            select(QueryLog, *self._stats_columns())
+            .order_by(QueryLog.created_at.desc(), QueryLog.id.desc())
+            .limit(limit)
+        )
+        rows = (await self.session.execute(statement)).all()
+        if not rows:
+            return {"stats": _stats_from_row((0, None, None, None, None)), "recent": []}
         return {
-            "total_queries": total,
-            "avg_response_time_ms": sum(response_times) / len(response_times) if response_times else None,
-            "avg_confidence": sum(confidences) / len(confidences) if confidences else None,
-            "search_mode_distribution": search_modes,
-            "query_type_distribution": query_types,
+            "stats": _stats_from_row(rows[0][1:]),
+            "recent": [row[0] for row in rows],
         }
+
+    def _stats_columns(self) -> list:
+        """Uncorrelated scalar subqueries computing every get_stats field."""
+        json_object_agg = (
+            func.json_object_agg
+            if self.session.bind.dialect.name == "postgresql"
+            else func.json_group_object
+        )
+        modes = (
+            select(QueryLog.search_mode.label("key"), func.count().label("n"))
+            .group_by(QueryLog.search_mode)
+            .subquery()
+        )
+        types = (
+            select(QueryLog.query_type.label("key"), func.count().label("n"))
+            .where(QueryLog.query_type.isnot(None), QueryLog.query_type != "")
+            .group_by(QueryLog.query_type)
+            .subquery()
+        )
+        # NULLIF keeps the old behaviour of ignoring zero (falsy) values in the averages.
+        return [
+            select(func.count()).select_from(QueryLog).scalar_subquery(),
+            select(func.avg(func.nullif(QueryLog.response_time_ms, 0))).scalar_subquery(),
+            select(func.avg(func.nullif(QueryLog.confidence, 0))).scalar_subquery(),
+            select(json_object_agg(modes.c.key, modes.c.n)).scalar_subquery(),
+            select(json_object_agg(types.c.key, types.c.n)).scalar_subquery(),
+        ]
+
+
+def _stats_from_row(values) -> dict[str, Any]:
+    """Build the get_stats dict from the values of ``_stats_columns``."""
+    total, avg_response_time, avg_confidence, search_modes, query_types = values
+    return {
+        "total_queries": total,
+        "avg_response_time_ms": avg_response_time,
+        "avg_confidence": avg_confidence,
+        "search_mode_distribution": _json_object(search_modes),
+        "query_type_distribution": _json_object(query_types),
+    }
+
+
+def _json_object(value) -> dict[str, Any]:
+    """Decode a JSON object aggregate, which drivers return as text (or NULL when empty)."""
+    if value is None:
+        return {}
+    return json.loads(value) if isinstance(value, str) else dict(value)
+
+
+class EmbeddingCacheRepository:
+    """Repository for cached embeddings, fronted by a process-wide in-memory LRU."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_hash(self, text_hash: int) -> np.ndarray | None:
+        """Get a cached embedding by text hash, checking the in-memory LRU first."""
+        with _embedding_memory_lock:
+            embedding = _embedding_memory.get(text_hash)
+            if embedding is not None:
+                _embedding_memory.move_to_end(text_hash)
+                _embedding_memory_stats["hits"] += 1
+                return embedding
+            _embedding_memory_stats["misses"] += 1
+
+        result = await self.session.execute(_EMBEDDING_BY_HASH, {"text_hash": text_hash})
+        row = result.scalar_one_or_none()
+        if row is None:
+            return None
+
+        embedding = row.load_embedding(settings.embedding_dimension)
+        if embedding is None:
+            logger.warning("Ignoring cached embedding %d in an unexpected format", text_hash)
+            return None
+        _remember_embeddings({text_hash: embedding})
+        return embedding
+
+    async def get_many_by_hash(self, text_hashes: list[int]) -> list[np.ndarray | None]:
+        """Get cached embeddings for several hashes with one LRU pass and one IN query."""
+        found: dict[int, np.ndarray] = {}
+        with _embedding_memory_lock:
+            for text_hash in text_hashes:
+                embedding = _embedding_memory.get(text_hash)
+                if embedding is not None:
+                    _embedding_memory.move_to_end(text_hash)
+                    found[text_hash] = embedding
+            _embedding_memory_stats["hits"] += len(found)
+            _embedding_memory_stats["misses"] += len(text_hashes) - len(found)
+
+        missing = list({h for h in text_hashes if h not in found})
+        if missing:
+            statement = select(
+                EmbeddingCache.text_hash, EmbeddingCache.embedding, EmbeddingCache.scale
+            ).where(EmbeddingCache.text_hash.in_(missing))
+            rows = (await self.session.execute(statement)).all()
+            loaded = _dequantize_rows(rows, settings.embedding_dimension)
+            _remember_embeddings(loaded)
+            found.update(loaded)
+
+        return [found.get(text_hash) for text_hash in text_hashes]
+
+    async def upsert(
+        self,
+        text_hash: int,
+        embedding: np.ndarray,
+        model_name: str,
+    ) -> EmbeddingCache:
+        """Insert or replace the cached embedding for a text hash."""
+        new_row = EmbeddingCache.from_embedding(text_hash, embedding, model_name)
+        result = await self.session.execute(_EMBEDDING_BY_HASH, {"text_hash": text_hash})
+        row = result.scalar_one_or_none()
+        if row is None:
+            row = new_row
+            self.session.add(row)
+        else:
+            row.embedding = new_row.embedding
+            row.scale = new_row.scale
+            row.model_name = model_name
+        await self.session.commit()
+
+        with _embedding_memory_lock:
+            _embedding_memory.pop(text_hash, None)
+        return row
+
+
+def _dequantize_rows(rows: list, dimension: int) -> dict[int, np.ndarray]:
+    """Dequantize (text_hash, embedding, scale) rows in one array op.
+
+    Rows whose blob is not ``dimension`` bytes (not uint8-quantized) are skipped
+    so they read as misses instead of being decoded as garbage.
+    """
+    valid = [row for row in rows if len(row[1]) == dimension]
+    if len(valid) < len(rows):
+        logger.warning("Ignoring %d cached embeddings in an unexpected format", len(rows) - len(valid))
+    if not valid:
+        return {}
+    hashes, blobs, scales = zip(*valid)
+    quantized = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), -1)
+    matrix = (quantized.astype(np.float32) - 128) * np.asarray(scales, dtype=np.float32)[:, None]
+    return dict(zip(hashes, matrix))
+
+
+def _remember_embeddings(embeddings: dict[int, np.ndarray]) -> None:
+    """Add read-only embeddings to the in-memory LRU, evicting the oldest."""
+    for embedding in embeddings.values():
+        embedding.flags.writeable = False
+    with _embedding_memory_lock:
+        _embedding_memory.update(embeddings)
+        for _ in range(len(_embedding_memory) - _EMBEDDING_MEMORY_SIZE):
+            _embedding_memory.popitem(last=False)
+
+
+def get_embedding_memory_stats() -> dict[str, int]:
+    """Get hit/miss counters and size of the in-memory embedding LRU."""
+    with _embedding_memory_lock:
+        return {**_embedding_memory_stats, "size": len(_embedding_memory)}
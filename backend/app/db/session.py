@@ -1,9 +1,12 @@
 """Database connection and session management."""
 
 import logging
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Iterator
 
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlmodel import SQLModel
 
@@ -13,6 +16,47 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///./qonfido_rag.db"
 
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
+
+# Tables superseded by renamed ones with an incompatible schema; dropped on startup.
+_RETIRED_TABLES = ("embedding_cache",)
+
+
+# Per-context statement counter, active only inside ``count_queries``.
+_query_counter: ContextVar[list[int] | None] = ContextVar("db_query_counter", default=None)
+
+
+def _count_query(*_args, **_kwargs) -> None:
+    """Increment the active statement counter, if any."""
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextmanager
+def count_queries() -> Iterator[list[int]]:
+    """Count SQL statements executed in this context; the total is in ``counter[0]``."""
+    counter = [0]
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    """Switch new SQLite connections to WAL with relaxed (still crash-safe) syncing."""
+    cursor = dbapi_connection.cursor()
+    for pragma in _SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
 
 class DatabaseManager:
     """Database connection manager supporting SQLite and PostgreSQL with async operations."""
@@ -21,6 +65,7 @@ class DatabaseManager:
         self.database_url = database_url or DEFAULT_DATABASE_URL
         self._engine = None
         self._async_session_maker = None
+        self._lock = threading.Lock()
 
     def _normalize_database_url(self, url: str) -> str:
         """Normalize database URL for async SQLAlchemy compatibility.
@@ -36,18 +81,33 @@ class DatabaseManager:
     @property
     def engine(self):
         """Lazy load async database engine."""
-        if self._engine is None:
+        if self._engine is not None:
+            return self._engine
+        with self._lock:
+            if self._engine is not None:
+                return self._engine
             normalized_url = self._normalize_database_url(self.database_url)
             
-            connect_args = {}
+            engine_kwargs = {"query_cache_size": settings.db_statement_cache_size}
             if normalized_url.startswith("sqlite"):
-                connect_args = {"check_same_thread": False}
+                engine_kwargs["connect_args"] = {"check_same_thread": False}
+            elif normalized_url.startswith("postgresql"):
+                engine_kwargs.update(
+                    pool_size=settings.db_pool_size,
+                    max_overflow=settings.db_pool_overflow,
+                    pool_recycle=settings.db_pool_recycle,
+                    pool_pre_ping=True,
+                    connect_args={"prepared_statement_cache_size": settings.db_statement_cache_size},
+                )
 
             self._engine = create_async_engine(
                 normalized_url,
                 echo=False,
-                connect_args=connect_args,
+                **engine_kwargs,
             )
+            if normalized_url.startswith("sqlite"):
+                event.listen(self._engine.sync_engine, "connect", _set_sqlite_pragmas)
+            event.listen(self._engine.sync_engine, "before_cursor_execute", _count_query)
             log_url = normalized_url.split("@")[-1] if "@" in normalized_url else normalized_url
             logger.info(f"Async database engine created: {log_url}")
         
@@ -57,16 +117,21 @@ class DatabaseManager:
     def async_session_maker(self):
         """Get async session maker."""
         if self._async_session_maker is None:
-            self._async_session_maker = async_sessionmaker(
-                self.engine,
-                class_=AsyncSession,
-                expire_on_commit=False,
-            )
+            engine = self.engine
+            with self._lock:
+                if self._async_session_maker is None:
+                    self._async_session_maker = async_sessionmaker(
+                        engine,
+                        class_=AsyncSession,
+                        expire_on_commit=False,
+                    )
         return self._async_session_maker
 
     async def create_tables(self) -> None:
         """Create all database tables asynchronously."""
         async with self.engine.begin() as conn:
+            for table in _RETIRED_TABLES:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
             await conn.run_sync(SQLModel.metadata.create_all)
         logger.info("Database tables created")
 
@@ -89,6 +154,7 @@ class DatabaseManager:
 
 
 _db_manager: DatabaseManager | None = None
+_db_manager_lock = threading.Lock()
 
 
 def get_db_manager(database_url: str | None = None) -> DatabaseManager:
@@ -96,8 +162,10 @@ def get_db_manager(database_url: str | None = None) -> DatabaseManager:
     """
     global _db_manager
     if _db_manager is None:
-        url = database_url or settings.database_url or DEFAULT_DATABASE_URL
-        _db_manager = DatabaseManager(url)
+        with _db_manager_lock:
+            if _db_manager is None:
+                url = database_url or settings.database_url or DEFAULT_DATABASE_URL
+                _db_manager = DatabaseManager(url)
     return _db_manager
 
 
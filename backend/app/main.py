@@ -1,14 +1,17 @@
 """Main entry point for the FastAPI application."""
 
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
 from app.config import settings
 from app.core.orchestration import get_pipeline
+from app.db import count_queries, get_query_log_writer, init_db
 from app.utils.logging import setup_logging
 
 logger = logging.getLogger(__name__)
@@ -36,13 +39,44 @@ async def lifespan(app: FastAPI):
         logger.warning(f"⚠ Failed to pre-load funds cache: {e}")
         logger.info("  Funds will be loaded on first request")
     
+    # Build cache singletons now so no request pays the (possibly slow) Redis connect
+    try:
+        from app.services.cache import get_embedding_cache, get_query_cache
+        get_embedding_cache()
+        get_query_cache()
+    except Exception as e:
+        logger.warning(f"⚠ Failed to initialize caches: {e}")
+    
     logger.info("\n[2/2] Pre-initializing RAG pipeline...")
     logger.info("  This includes:")
     logger.info("    - Downloading embedding model (first time only, ~2.3GB)")
     logger.info("    - Generating embeddings for all documents")
     logger.info("    - Indexing for semantic and lexical search")
     logger.info("  This may take a few minutes on first run...")
+    logger.info("  Running in the background; /api/v1/ready reports 503 until it finishes")
+    
+    # Initialize off the event loop so the port opens and health probes answer while warming up
+    app.state.ready = asyncio.Event()
+    app.state.init_task = asyncio.create_task(asyncio.to_thread(_initialize_pipeline))
+    app.state.init_task.add_done_callback(lambda _: app.state.ready.set())
     
+    if settings.query_log_enabled:
+        try:
+            await init_db()
+            get_query_log_writer().start()
+        except Exception as e:
+            logger.warning(f"⚠ Query logging disabled, database unavailable: {e}")
+
+    yield
+    
+    logger.info("\nShutting down backend...")
+    await get_query_log_writer().shutdown()
+    from app.services.cache import close_caches
+    close_caches()
+
+
+def _initialize_pipeline() -> None:
+    """Build the RAG pipeline indexes (runs in a worker thread during startup)."""
     try:
         pipeline = get_pipeline()
         pipeline.initialize()
@@ -54,10 +88,6 @@ async def lifespan(app: FastAPI):
         logger.error(f"\n✗ Failed to initialize RAG pipeline: {e}")
         logger.warning("API will start, but query functionality may be limited")
         logger.warning("Try restarting the server once the model download completes\n")
-    
-    yield
-    
-    logger.info("\nShutting down backend...")
 
 
 def create_app() -> FastAPI:
@@ -74,12 +104,30 @@ def create_app() -> FastAPI:
 
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],
+        allow_origins=settings.cors_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
     )
 
+    @app.middleware("http")
+    async def record_response_time(request: Request, call_next):
+        """Stamp requests with a monotonic start time and report their latency."""
+        request.state.start_ns = time.perf_counter_ns()
+        response = await call_next(request)
+        response_time_ms = (time.perf_counter_ns() - request.state.start_ns) / 1e6
+        response.headers["X-Response-Time-Ms"] = f"{response_time_ms:.3f}"
+        return response
+
+    if settings.debug:
+        @app.middleware("http")
+        async def record_query_count(request: Request, call_next):
+            """Report how many SQL statements a request executed (debug only)."""
+            with count_queries() as counter:
+                response = await call_next(request)
+            response.headers["X-DB-Query-Count"] = str(counter[0])
+            return response
+
     app.include_router(api_router, prefix="/api/v1")
 
     return app
@@ -4,6 +4,8 @@ from app.services.cache import (
     EmbeddingCache,
     InMemoryCache,
     QueryCache,
+    ShardedLRUCache,
+    SharedMemoryCache,
     get_cache,
     get_embedding_cache,
     get_query_cache,
@@ -14,6 +16,8 @@ __all__ = [
     "InMemoryCache",
     "EmbeddingCache",
     "QueryCache",
+    "ShardedLRUCache",
+    "SharedMemoryCache",
     "get_cache",
     "get_embedding_cache",
     "get_query_cache",
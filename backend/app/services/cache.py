@@ -1,13 +1,22 @@
 """Caching service for embeddings and query results."""
 
 import hashlib
+import heapq
 import json
 import logging
 import pickle
+import re
+import struct
+import tempfile
 import time
 import threading
+import weakref
 from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 import numpy as np
@@ -21,68 +30,185 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+    blake3 = None
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+    fcntl = None
+
+
+def _digest(data: bytes) -> bytes:
+    """128-bit digest of ``data`` (BLAKE3 when available, else BLAKE2b)."""
+    if BLAKE3_AVAILABLE:
+        return blake3(data).digest(length=16)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _prefixed_digests(prefix: bytes, texts) -> list[bytes]:
+    """``prefix + _digest(text.encode())`` for many texts, with hashers bound locally."""
+    encode = str.encode
+    if BLAKE3_AVAILABLE:
+        hasher = blake3
+        return [prefix + hasher(encode(text)).digest(length=16) for text in texts]
+    hasher = hashlib.blake2b
+    return [prefix + hasher(encode(text), digest_size=16).digest() for text in texts]
+
+
+# Backends accept str keys and the raw-digest bytes keys built by EmbeddingCache/QueryCache
+CacheKey = str | bytes
+
+# Sweep period for the process-wide backend, whose sweeper close_caches() stops;
+# ad-hoc caches leave expiry to writes so they never own a thread.
+_SWEEP_INTERVAL = 30.0
+
+
+class _ExpirySweeper:
+    """Daemon thread calling a cache's cleanup_expired every ``interval`` seconds.
+
+    Holds the cache weakly, so an unreferenced cache is collected and the
+    thread exits at its next tick.
+    """
 
-@dataclass
+    def __init__(self, cache, interval: float):
+        self._cleanup = weakref.WeakMethod(cache.cleanup_expired)
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cache-sweeper", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            cleanup = self._cleanup()
+            if cleanup is None:
+                return
+            try:
+                removed = cleanup()
+            except Exception as e:
+                logger.warning("Cache sweep failed: %s", e)
+                continue
+            if removed:
+                logger.debug("Cache sweep removed %d expired entries", removed)
+            del cleanup
+
+    def stop(self) -> None:
+        """Stop the sweeper thread."""
+        self._stopped.set()
+
+
+@dataclass(slots=True)
 class CacheEntry:
-    """Cache entry with value and TTL metadata."""
+    """Cache entry with value, absolute expiry time and last access time for approximate LRU."""
     value: Any
-    created_at: float
-    ttl: float
+    expires_at: float
+    last_access: float = 0.0
 
 
 class InMemoryCache:
     """
-    Thread-safe in-memory cache with LRU eviction and TTL support.
+    Thread-safe in-memory cache with approximate LRU eviction and TTL support.
     
     Improvements for Dev Mode:
-    1. Thread-Safe: Uses RLock to handle concurrent FastAPI requests safely.
-    2. LRU Eviction: Automatically removes oldest items when max_size is reached to prevent OOM.
-    3. Deep Copy: Simulates serialization to prevent shared-reference bugs.
+    1. Thread-Safe: Writes take an RLock; reads are lock-free dict lookups that
+       only stamp the entry's last access time (a benign race).
+    2. LRU Eviction: When max_size is exceeded, the least recently accessed
+       entries are evicted in a small batch to prevent OOM.
+    3. Shared References: Values are stored and returned as-is, not copied;
+       callers must not mutate what they get back.
     """
 
-    def __init__(self, default_ttl: float = 3600, max_size: int = 1000):
-        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+    def __init__(
+        self,
+        default_ttl: float = 3600,
+        max_size: int = 1000,
+        sweep_interval: float | None = None,
+    ):
+        self._cache: dict[CacheKey, CacheEntry] = {}
+        # (expires_at, key) min-heap; entries for re-set or evicted keys go stale and are skipped
+        self._expiry_heap: list[tuple[float, CacheKey]] = []
         self.default_ttl = default_ttl
         self.max_size = max_size
+        # Evict a slice at a time so the O(n) selection is amortized over many sets
+        self._evict_batch = max(1, max_size // 16)
         self._lock = threading.RLock()
+        # Background expiry keeps TTL bookkeeping off the request path
+        self._sweeper = _ExpirySweeper(self, sweep_interval) if sweep_interval else None
 
     def _is_expired(self, entry: CacheEntry) -> bool:
         """Check if cache entry is expired."""
-        return time.time() > entry.created_at + entry.ttl
+        return time.time() > entry.expires_at
 
-    def get(self, key: str) -> Any | None:
-        """Get value from cache, moving it to the end (most recently used)."""
-        with self._lock:
-            entry = self._cache.get(key)
-            if entry is None:
-                return None
-            
-            if self._is_expired(entry):
-                del self._cache[key]
-                return None
-            
-            # Move to end (mark as recently used)
-            self._cache.move_to_end(key)
-            return entry.value
+    def get(self, key: CacheKey) -> Any | None:
+        """Get value from cache without locking, marking it as recently used."""
+        entry = self._cache.get(key)
+        if entry is None or self._is_expired(entry):
+            # Expired entries are reclaimed by the expiry heap under the lock
+            return None
+        entry.last_access = time.monotonic()
+        return entry.value
+
+    def get_many(self, keys: list[CacheKey]) -> list[Any | None]:
+        """Get several values (None for misses) without locking."""
+        return [self.get(key) for key in keys]
 
-    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
-        """Set value in cache with LRU eviction."""
+    def set(self, key: CacheKey, value: Any, ttl: float | None = None) -> None:
+        """Set value in cache, evicting least recently accessed entries when full."""
         with self._lock:
-            # If updating existing key, move to end
-            if key in self._cache:
-                self._cache.move_to_end(key)
-            
-            self._cache[key] = CacheEntry(
+            entry = CacheEntry(
                 value=value,
-                created_at=time.time(),
-                ttl=ttl or self.default_ttl,
+                expires_at=time.time() + (ttl or self.default_ttl),
+                last_access=time.monotonic(),
             )
+            self._cache[key] = entry
+            heapq.heappush(self._expiry_heap, (entry.expires_at, key))
             
-            # Evict oldest items if over capacity
+            # Evict least recently accessed items if over capacity
             if len(self._cache) > self.max_size:
-                self._cache.popitem(last=False)  # Pop first item (least recently used)
+                coldest = heapq.nsmallest(
+                    self._evict_batch, self._cache.items(), key=lambda item: item[1].last_access
+                )
+                for cold_key, _ in coldest:
+                    del self._cache[cold_key]
+            self._maybe_expire_one()
+
+    def _maybe_expire_one(self) -> None:
+        """Lock-held: drop the earliest heap entry if expired or stale; compact an oversized heap."""
+        if len(self._expiry_heap) > 2 * self.max_size + 64:
+            self._expiry_heap = [
+                (entry.expires_at, key) for key, entry in self._cache.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+            return
+        if self._expiry_heap:
+            expires_at, key = self._expiry_heap[0]
+            entry = self._cache.get(key)
+            if entry is None or entry.expires_at != expires_at:
+                heapq.heappop(self._expiry_heap)
+            elif expires_at < time.time():
+                heapq.heappop(self._expiry_heap)
+                del self._cache[key]
 
-    def delete(self, key: str) -> bool:
+    def set_many(self, items: dict[CacheKey, Any], ttl: float | None = None) -> None:
+        """Set several values under a single lock acquisition."""
+        with self._lock:
+            for key, value in items.items():
+                self.set(key, value, ttl)
+
+    def delete(self, key: CacheKey) -> bool:
         """Delete key from cache."""
         with self._lock:
             if key in self._cache:
@@ -94,17 +220,26 @@ class InMemoryCache:
         """Clear all cache entries."""
         with self._lock:
             self._cache.clear()
+            self._expiry_heap.clear()
 
     def cleanup_expired(self) -> int:
-        """Remove expired entries."""
+        """Remove expired entries, popping the expiry heap only as far as the current time."""
+        removed = 0
+        now = time.time()
         with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if self._is_expired(entry)
-            ]
-            for key in expired_keys:
-                del self._cache[key]
-            return len(expired_keys)
+            heap = self._expiry_heap
+            while heap and heap[0][0] < now:
+                expires_at, key = heapq.heappop(heap)
+                entry = self._cache.get(key)
+                if entry is not None and entry.expires_at == expires_at:
+                    del self._cache[key]
+                    removed += 1
+            return removed
+
+    def close(self) -> None:
+        """Stop the background expiry sweeper."""
+        if self._sweeper is not None:
+            self._sweeper.stop()
 
     @property
     def size(self) -> int:
@@ -113,21 +248,168 @@ class InMemoryCache:
             return len(self._cache)
 
 
+class ShardedLRUCache:
+    """InMemoryCache split into independently locked shards to cut lock contention.
+
+    Keys are spread over ``num_shards`` InMemoryCache instances by hash, each
+    holding ``max_size // num_shards`` entries, so LRU order is per shard.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 3600,
+        max_size: int = 1000,
+        num_shards: int = 16,
+        sweep_interval: float | None = None,
+    ):
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._shards = [
+            InMemoryCache(default_ttl=default_ttl, max_size=max(1, max_size // num_shards))
+            for _ in range(num_shards)
+        ]
+        # One sweeper for all shards rather than a thread per shard
+        self._sweeper = _ExpirySweeper(self, sweep_interval) if sweep_interval else None
+
+    def _shard(self, key: CacheKey) -> InMemoryCache:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: CacheKey) -> Any | None:
+        """Get value from the key's shard."""
+        return self._shard(key).get(key)
+
+    def get_many(self, keys: list[CacheKey]) -> list[Any | None]:
+        """Get several values, batching lookups per shard."""
+        by_shard: dict[int, list[int]] = {}
+        for position, key in enumerate(keys):
+            by_shard.setdefault(hash(key) % len(self._shards), []).append(position)
+        results: list[Any | None] = [None] * len(keys)
+        for shard_index, positions in by_shard.items():
+            values = self._shards[shard_index].get_many([keys[p] for p in positions])
+            for position, value in zip(positions, values):
+                results[position] = value
+        return results
+
+    def set(self, key: CacheKey, value: Any, ttl: float | None = None) -> None:
+        """Set value in the key's shard."""
+        self._shard(key).set(key, value, ttl)
+
+    def set_many(self, items: dict[CacheKey, Any], ttl: float | None = None) -> None:
+        """Set several values, taking each shard's lock at most once."""
+        by_shard: dict[int, dict[CacheKey, Any]] = {}
+        for key, value in items.items():
+            by_shard.setdefault(hash(key) % len(self._shards), {})[key] = value
+        for shard_index, shard_items in by_shard.items():
+            self._shards[shard_index].set_many(shard_items, ttl)
+
+    def delete(self, key: CacheKey) -> bool:
+        """Delete key from its shard."""
+        return self._shard(key).delete(key)
+
+    def clear(self) -> None:
+        """Clear all shards."""
+        for shard in self._shards:
+            shard.clear()
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries from every shard."""
+        return sum(shard.cleanup_expired() for shard in self._shards)
+
+    def close(self) -> None:
+        """Stop the background expiry sweeper."""
+        if self._sweeper is not None:
+            self._sweeper.stop()
+
+    @property
+    def size(self) -> int:
+        """Get number of entries across shards."""
+        return sum(shard.size for shard in self._shards)
+
+
+# Raw ndarray wire format: magic, dtype code, ndim, uint32 shape, then the array buffer
+_NDARRAY_MAGIC = b"\x93NPY"
+_NDARRAY_HEADER = struct.Struct("<4sBB")
+_NDARRAY_DTYPES = (np.float32, np.float16, np.float64, np.int8, np.uint8, np.int32, np.int64)
+_NDARRAY_DTYPE_CODES = {np.dtype(dtype): code for code, dtype in enumerate(_NDARRAY_DTYPES)}
+# Protocol 2+ pickles start with the PROTO opcode; anything else is JSON
+_PICKLE_PREFIX = b"\x80"
+
+
+def _serialize_value(value: Any) -> bytes:
+    """Serialize a cache value to bytes (raw buffer for ndarrays, JSON for dict/list)."""
+    if isinstance(value, np.ndarray):
+        code = _NDARRAY_DTYPE_CODES.get(value.dtype)
+        if code is None:
+            return pickle.dumps(value)
+        header = _NDARRAY_HEADER.pack(_NDARRAY_MAGIC, code, value.ndim)
+        return header + struct.pack(f"<{value.ndim}I", *value.shape) + value.tobytes()
+    elif isinstance(value, (dict, list)):
+        if not ORJSON_AVAILABLE:
+            return json.dumps(value).encode('utf-8')
+        try:
+            return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # Non-string keys or unsupported types: keep them intact via pickle
+            return pickle.dumps(value)
+    else:
+        return pickle.dumps(value)
+
+
+def _deserialize_value(data: bytes | None) -> Any:
+    """Deserialize bytes written by _serialize_value."""
+    if data is None:
+        return None
+    if data[:4] == _NDARRAY_MAGIC:
+        _, code, ndim = _NDARRAY_HEADER.unpack_from(data)
+        shape = struct.unpack_from(f"<{ndim}I", data, _NDARRAY_HEADER.size)
+        offset = _NDARRAY_HEADER.size + 4 * ndim
+        return np.frombuffer(data, dtype=_NDARRAY_DTYPES[code], offset=offset).reshape(shape)
+    
+    if data[:1] == _PICKLE_PREFIX:
+        try:
+            return pickle.loads(data)
+        except Exception:
+            pass
+    try:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(data)
+        return json.loads(data.decode('utf-8'))
+    except Exception:
+        return None
+
+
 class RedisCache:
-    """Redis-based cache with TTL support."""
+    """Redis-based cache with TTL support.
 
-    def __init__(self, redis_url: str, default_ttl: float = 3600):
-        """Initialize Redis cache."""
+    Keys that just missed are remembered locally for ``negative_ttl`` seconds
+    so repeated probes for the same cold key skip the network round-trip.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        default_ttl: float = 3600,
+        max_connections: int = 32,
+        negative_ttl: float = 1.0,
+        max_negative_entries: int = 4096,
+    ):
+        """Initialize Redis cache backed by a shared connection pool."""
         if not REDIS_AVAILABLE:
             raise ImportError("redis package is not installed. Install with: pip install redis")
         
         self.default_ttl = default_ttl
-        self._client = redis.from_url(
-            redis_url, 
+        self.negative_ttl = negative_ttl
+        self.max_negative_entries = max_negative_entries
+        self._misses: OrderedDict[CacheKey, float] = OrderedDict()
+        self._miss_lock = threading.Lock()
+        self._pool = redis.ConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
             decode_responses=False,
             socket_connect_timeout=2,
-            socket_timeout=2
+            socket_timeout=2,
         )
+        self._client = redis.Redis(connection_pool=self._pool)
         
         # Fail fast if Redis is unreachable
         try:
@@ -138,36 +420,71 @@ class RedisCache:
 
     def _serialize(self, value: Any) -> bytes:
         """Serialize value to bytes."""
-        if isinstance(value, np.ndarray):
-            return pickle.dumps(value)
-        elif isinstance(value, (dict, list)):
-            return json.dumps(value).encode('utf-8')
-        else:
-            return pickle.dumps(value)
+        return _serialize_value(value)
 
     def _deserialize(self, data: bytes | None) -> Any:
         """Deserialize bytes from Redis."""
-        if data is None:
-            return None
-        
-        try:
-            return pickle.loads(data)
-        except Exception:
-            try:
-                return json.loads(data.decode('utf-8'))
-            except Exception:
-                return None
-
-    def get(self, key: str) -> Any | None:
+        return _deserialize_value(data)
+
+    def _recently_missed(self, key: CacheKey) -> bool:
+        """Whether key missed within the last negative_ttl seconds."""
+        with self._miss_lock:
+            missed_at = self._misses.get(key)
+            if missed_at is None:
+                return False
+            if time.monotonic() - missed_at > self.negative_ttl:
+                del self._misses[key]
+                return False
+            return True
+
+    def _remember_misses(self, keys: list[CacheKey]) -> None:
+        """Record keys that just missed, dropping the oldest beyond the cap."""
+        if self.negative_ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._miss_lock:
+            for key in keys:
+                self._misses[key] = now
+                self._misses.move_to_end(key)
+            while len(self._misses) > self.max_negative_entries:
+                self._misses.popitem(last=False)
+
+    def _forget_misses(self, keys) -> None:
+        """Drop keys from the miss cache once they are written or deleted."""
+        with self._miss_lock:
+            for key in keys:
+                self._misses.pop(key, None)
+
+    def get(self, key: CacheKey) -> Any | None:
         """Get value from Redis."""
+        if self._recently_missed(key):
+            return None
         try:
             data = self._client.get(key)
-            return self._deserialize(data)
         except Exception as e:
             logger.warning(f"Redis get error for key {key}: {e}")
             return None
-
-    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        if data is None:
+            self._remember_misses([key])
+        return self._deserialize(data)
+
+    def get_many(self, keys: list[CacheKey]) -> list[Any | None]:
+        """Get several values from Redis in one MGET round-trip."""
+        results: list[Any | None] = [None] * len(keys)
+        positions = [i for i, key in enumerate(keys) if not self._recently_missed(key)]
+        if not positions:
+            return results
+        try:
+            fetched = self._client.mget([keys[i] for i in positions])
+        except Exception as e:
+            logger.warning(f"Redis mget error for {len(positions)} keys: {e}")
+            return results
+        self._remember_misses([keys[i] for i, data in zip(positions, fetched) if data is None])
+        for i, data in zip(positions, fetched):
+            results[i] = self._deserialize(data)
+        return results
+
+    def set(self, key: CacheKey, value: Any, ttl: float | None = None) -> None:
         """Set value in Redis with TTL."""
         try:
             serialized = self._serialize(value)
@@ -175,9 +492,25 @@ class RedisCache:
             self._client.setex(key, ttl_seconds, serialized)
         except Exception as e:
             logger.warning(f"Redis set error for key {key}: {e}")
+        self._forget_misses([key])
 
-    def delete(self, key: str) -> bool:
+    def set_many(self, items: dict[CacheKey, Any], ttl: float | None = None) -> None:
+        """Set several values with TTL in one pipelined round-trip."""
+        if not items:
+            return
+        ttl_seconds = int(ttl or self.default_ttl)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl_seconds, self._serialize(value))
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Redis pipelined set error for %d keys: %s", len(items), e)
+        self._forget_misses(items)
+
+    def delete(self, key: CacheKey) -> bool:
         """Delete key from Redis."""
+        self._forget_misses([key])
         try:
             result = self._client.delete(key)
             return result > 0
@@ -187,6 +520,8 @@ class RedisCache:
 
     def clear(self) -> None:
         """Flush Redis database."""
+        with self._miss_lock:
+            self._misses.clear()
         try:
             self._client.flushdb()
             logger.info("Redis cache cleared")
@@ -197,6 +532,10 @@ class RedisCache:
         """Redis handles TTL natively."""
         return 0
 
+    def close(self) -> None:
+        """Disconnect pooled Redis connections."""
+        self._pool.disconnect()
+
     @property
     def size(self) -> int:
         """Get approximate number of keys."""
@@ -207,132 +546,418 @@ class RedisCache:
             return 0
 
 
+# Shared-memory slot: seqlock counter, key digest, expiry, payload length (then the payload)
+_SLOT_SEQ = struct.Struct("<Q")
+_SLOT_META = struct.Struct("<16sdI4x")
+_SLOT_HEADER_SIZE = _SLOT_SEQ.size + _SLOT_META.size
+_SEQLOCK_RETRIES = 8
+# Segment header: number of attached processes (the last one to close unlinks the segment)
+_SEGMENT_HEADER = struct.Struct("<Q56x")
+# Bump when the slot layout or value encoding changes so old segments are never reused
+_SHARED_CACHE_FORMAT = 1
+
+
+class SharedMemoryCache:
+    """Fixed-size cache in a SharedMemory segment shared by all worker processes.
+
+    The segment is a direct-mapped table of ``max_size`` slots of
+    ``slot_size`` bytes, indexed by key digest; a colliding set overwrites
+    the slot. Writers serialize on a file lock, readers take no lock and use
+    each slot's seqlock counter to retry torn reads. Values that do not fit
+    a slot are not cached. The segment name is derived from the format
+    version, ``namespace`` (e.g. embedding model and dimension) and layout,
+    so incompatible workers never share a table, and the last attached
+    process to close it unlinks it.
+    """
+
+    def __init__(
+        self,
+        name: str = "qonfido_cache",
+        default_ttl: float = 3600,
+        max_size: int = 5000,
+        slot_size: int = 4096 + 64,
+        namespace: str = "",
+    ):
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self.slot_size = slot_size
+        self._stride = _SLOT_HEADER_SIZE + slot_size
+        self._base = _SEGMENT_HEADER.size
+        self._oversize_logged = False
+        # Hashed so the name stays within POSIX shared memory name limits
+        identity = f"v{_SHARED_CACHE_FORMAT}|{namespace}|{max_size}|{slot_size}"
+        self.segment = f"{name}_{_digest(identity.encode())[:6].hex()}"
+        self._thread_lock = threading.Lock()
+        self._lock_path = f"{tempfile.gettempdir()}/{self.segment}.lock"
+        # Attach under the writer lock so a concurrent last close cannot unlink underneath us
+        with self._write_lock():
+            try:
+                self._shm = SharedMemory(
+                    name=self.segment, create=True, size=self._base + max_size * self._stride
+                )
+                logger.info("Created shared memory cache %s (%d slots, %s)", self.segment, max_size, identity)
+            except FileExistsError:
+                self._shm = SharedMemory(name=self.segment)
+                logger.info("Attached to shared memory cache %s", self.segment)
+            # Lifetime is managed by the attach count, not by each process's resource tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+            self._buf = self._shm.buf
+            (attached,) = _SEGMENT_HEADER.unpack_from(self._buf, 0)
+            _SEGMENT_HEADER.pack_into(self._buf, 0, attached + 1)
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive writer lock across threads and processes."""
+        with self._thread_lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self._lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _slot_offsets(self) -> range:
+        """Byte offsets of every slot in the segment."""
+        return range(self._base, self._base + self.max_size * self._stride, self._stride)
+
+    def _slot(self, key: CacheKey) -> tuple[int, bytes]:
+        """Byte offset of the key's slot and the key digest stored in it."""
+        digest = _digest(key.encode() if isinstance(key, str) else key)
+        index = int.from_bytes(digest[:8], "little") % self.max_size
+        return self._base + index * self._stride, digest
+
+    def _read_slot(self, offset: int) -> tuple[bytes, float, bytes] | None:
+        """Seqlock read of (digest, expires_at, payload); None if writers kept it busy."""
+        buf = self._buf
+        for _ in range(_SEQLOCK_RETRIES):
+            (seq,) = _SLOT_SEQ.unpack_from(buf, offset)
+            if seq & 1:
+                continue
+            digest, expires_at, length = _SLOT_META.unpack_from(buf, offset + _SLOT_SEQ.size)
+            start = offset + _SLOT_HEADER_SIZE
+            payload = bytes(buf[start:start + min(length, self.slot_size)])
+            if _SLOT_SEQ.unpack_from(buf, offset)[0] == seq:
+                return digest, expires_at, payload
+        return None
+
+    def _write_slot(self, offset: int, digest: bytes, expires_at: float, payload: bytes) -> None:
+        """Writer-locked slot update bracketed by odd/even seqlock counters."""
+        buf = self._buf
+        (seq,) = _SLOT_SEQ.unpack_from(buf, offset)
+        _SLOT_SEQ.pack_into(buf, offset, seq + 1)
+        _SLOT_META.pack_into(buf, offset + _SLOT_SEQ.size, digest, expires_at, len(payload))
+        start = offset + _SLOT_HEADER_SIZE
+        buf[start:start + len(payload)] = payload
+        _SLOT_SEQ.pack_into(buf, offset, seq + 2)
+
+    def get(self, key: CacheKey) -> Any | None:
+        """Get value from shared memory without locking."""
+        offset, digest = self._slot(key)
+        slot = self._read_slot(offset)
+        if slot is None or slot[0] != digest or slot[1] < time.time():
+            return None
+        return _deserialize_value(slot[2])
+
+    def get_many(self, keys: list[CacheKey]) -> list[Any | None]:
+        """Get several values (None for misses)."""
+        return [self.get(key) for key in keys]
+
+    def set(self, key: CacheKey, value: Any, ttl: float | None = None) -> None:
+        """Set value in the key's slot, replacing whatever it held."""
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: dict[CacheKey, Any], ttl: float | None = None) -> None:
+        """Set several values under a single writer lock acquisition."""
+        expires_at = time.time() + (ttl or self.default_ttl)
+        slots = []
+        for key, value in items.items():
+            payload = _serialize_value(value)
+            if len(payload) > self.slot_size:
+                if not self._oversize_logged:
+                    self._oversize_logged = True
+                    logger.warning(
+                        "Value of %d bytes exceeds shared cache slot size %d and is not cached "
+                        "(further oversized values are skipped silently)",
+                        len(payload), self.slot_size,
+                    )
+                continue
+            slots.append((*self._slot(key), payload))
+        if not slots:
+            return
+        with self._write_lock():
+            for offset, digest, payload in slots:
+                self._write_slot(offset, digest, expires_at, payload)
+
+    def delete(self, key: CacheKey) -> bool:
+        """Delete key if its slot still holds it."""
+        offset, digest = self._slot(key)
+        with self._write_lock():
+            slot = self._read_slot(offset)
+            if slot is None or slot[0] != digest:
+                return False
+            self._write_slot(offset, bytes(16), 0.0, b"")
+            return True
+
+    def clear(self) -> None:
+        """Clear all slots."""
+        with self._write_lock():
+            for offset in self._slot_offsets():
+                self._write_slot(offset, bytes(16), 0.0, b"")
+
+    def cleanup_expired(self) -> int:
+        """Empty slots whose entries have expired."""
+        removed = 0
+        now = time.time()
+        with self._write_lock():
+            for offset in self._slot_offsets():
+                digest, expires_at, _ = _SLOT_META.unpack_from(self._buf, offset + _SLOT_SEQ.size)
+                if digest != bytes(16) and expires_at < now:
+                    self._write_slot(offset, bytes(16), 0.0, b"")
+                    removed += 1
+        return removed
+
+    def close(self) -> None:
+        """Detach from the segment, unlinking it if no other process is attached."""
+        if self._buf is None:
+            return
+        with self._write_lock():
+            (attached,) = _SEGMENT_HEADER.unpack_from(self._buf, 0)
+            remaining = max(0, attached - 1)
+            _SEGMENT_HEADER.pack_into(self._buf, 0, remaining)
+            self._buf = None
+            self._shm.close()
+            if remaining == 0:
+                # unlink() unregisters from the resource tracker, so register first
+                resource_tracker.register(self._shm._name, "shared_memory")
+                self._shm.unlink()
+                logger.info("Unlinked shared memory cache %s", self.segment)
+
+    @property
+    def size(self) -> int:
+        """Get number of live entries across all slots."""
+        now = time.time()
+        count = 0
+        for offset in self._slot_offsets():
+            digest, expires_at, _ = _SLOT_META.unpack_from(self._buf, offset + _SLOT_SEQ.size)
+            if digest != bytes(16) and expires_at >= now:
+                count += 1
+        return count
+
+
 class EmbeddingCache:
-    """Specialized cache for embeddings using text hash as key."""
+    """Specialized cache for embeddings using text hash as key.
+
+    Embeddings are stored compressed according to dtype_policy ("float32",
+    "float16" or symmetric "int8") and returned as contiguous float32.
+    """
 
-    def __init__(self, cache: InMemoryCache | RedisCache | None = None):
+    _DTYPE_POLICIES = ("float32", "float16", "int8")
+
+    def __init__(
+        self,
+        cache: InMemoryCache | ShardedLRUCache | SharedMemoryCache | RedisCache | None = None,
+        dtype_policy: str = "float16",
+        write_through: bool = True,
+    ):
+        if dtype_policy not in self._DTYPE_POLICIES:
+            raise ValueError(f"Unknown dtype_policy: {dtype_policy}")
         # Use a larger max_size for embeddings in dev mode (e.g. 5000 vectors)
-        self._cache = cache or InMemoryCache(default_ttl=86400, max_size=5000)
+        self._cache = cache or ShardedLRUCache(default_ttl=86400, max_size=5000)
+        self.dtype_policy = dtype_policy
+        self._writes_enabled = write_through
 
-    def _hash_text(self, text: str) -> str:
-        """Generate SHA256 hash for text."""
-        return hashlib.sha256(text.encode()).hexdigest()
+    def _hash_text(self, text: str) -> bytes:
+        """Generate the cache key for text: a prefix plus its raw 128-bit digest."""
+        return b"emb:" + _digest(text.encode())
 
     def get_embedding(self, text: str) -> np.ndarray | None:
         """Get cached embedding for text."""
-        key = f"emb:{self._hash_text(text)}"
-        return self._cache.get(key)
+        key = self._hash_text(text)
+        return self._decode(self._cache.get(key))
 
     def set_embedding(self, text: str, embedding: np.ndarray) -> None:
-        """Cache embedding for text."""
-        key = f"emb:{self._hash_text(text)}"
-        self._cache.set(key, embedding)
+        """Cache embedding for text (skipped while writes are disabled)."""
+        if not self._writes_enabled:
+            return
+        key = self._hash_text(text)
+        self._cache.set(key, self._encode(embedding))
+
+    def set_batch(self, texts: list[str], embeddings: list[np.ndarray]) -> None:
+        """Cache several embeddings in one backend call (skipped while writes are disabled)."""
+        if not self._writes_enabled:
+            return
+        keys = _prefixed_digests(b"emb:", texts)
+        self._cache.set_many({
+            key: self._encode(embedding) for key, embedding in zip(keys, embeddings)
+        })
 
     def get_batch(self, texts: list[str]) -> tuple[list[np.ndarray | None], list[int]]:
         """Get cached embeddings for batch, returns embeddings and uncached indices."""
-        results = []
-        uncached_indices = []
-        
-        for i, text in enumerate(texts):
-            embedding = self.get_embedding(text)
-            results.append(embedding)
-            if embedding is None:
-                uncached_indices.append(i)
-        
+        # Hash and probe each distinct text once, then scatter results back to every position
+        unique: dict[str, int] = {}
+        order = [unique.setdefault(text, len(unique)) for text in texts]
+        keys = _prefixed_digests(b"emb:", unique)
+        unique_results = [self._decode(raw) for raw in self._cache.get_many(keys)]
+        results = [unique_results[slot] for slot in order]
+        uncached_indices = [i for i, embedding in enumerate(results) if embedding is None]
         return results, uncached_indices
 
+    @contextmanager
+    def bulk_indexing(self):
+        """Disable cache writes for bulk (re)indexing whose embeddings are unlikely to be reused."""
+        previous = self._writes_enabled
+        self._writes_enabled = False
+        try:
+            yield self
+        finally:
+            self._writes_enabled = previous
+
+    def _encode(self, embedding: np.ndarray) -> np.ndarray | tuple[np.ndarray, float]:
+        """Compress an embedding for storage according to the dtype policy."""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if self.dtype_policy == "float16":
+            return embedding.astype(np.float16)
+        if self.dtype_policy == "int8":
+            scale = float(np.abs(embedding).max()) / 127.0 or 1.0
+            return np.round(embedding / scale).astype(np.int8), scale
+        return embedding
+
+    @staticmethod
+    def _decode(raw: np.ndarray | tuple[np.ndarray, float] | None) -> np.ndarray | None:
+        """Expand a stored embedding back to contiguous float32."""
+        if raw is None:
+            return None
+        if isinstance(raw, tuple):
+            quantized, scale = raw
+            return quantized.astype(np.float32) * np.float32(scale)
+        return np.ascontiguousarray(raw, dtype=np.float32)
+
     @property
     def cache_stats(self) -> dict:
         """Get cache statistics."""
-        return {"size": self._cache.size}
+        return {"size": self._cache.size, "dtype_policy": self.dtype_policy}
+
+
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def _compute_query_key(query: str, search_mode: str, top_k: int, source_filter: str | None) -> bytes:
+    """Normalize and hash query parameters, memoized so repeated queries skip the work."""
+    # Normalize query: case-insensitive, strip and collapse whitespace in one regex pass
+    normalized_query = _WS_RE.sub(" ", query.strip()).casefold()
+    key_parts = [normalized_query, search_mode, str(top_k), (source_filter or "").strip().lower()]
+    key_str = "|".join(key_parts)
+    return b"query:" + _digest(key_str.encode())
 
 
 class QueryCache:
     """Cache for query results to avoid repeated processing."""
 
-    def __init__(self, cache: InMemoryCache | RedisCache | None = None):
-        self._cache = cache or InMemoryCache(default_ttl=300, max_size=500)
+    def __init__(
+        self,
+        cache: InMemoryCache | ShardedLRUCache | SharedMemoryCache | RedisCache | None = None,
+    ):
+        self._cache = cache or ShardedLRUCache(default_ttl=300, max_size=500)
 
-    def _make_key(
+    def make_key(
         self,
         query: str,
         search_mode: str,
         top_k: int,
-        source_filter: str | None,
-    ) -> str:
-        """Generate MD5 cache key from query parameters.
+        source_filter: str | None = None,
+    ) -> bytes:
+        """Generate a 128-bit hashed cache key from query parameters.
         
         Normalizes query string to handle whitespace and case differences.
+        Callers build the key once per request and reuse it for get and set.
         """
-        # Normalize query: case-insensitive, strip and normalize whitespace
-        normalized_query = " ".join(query.strip().lower().split())
-        key_parts = [normalized_query, search_mode, str(top_k), (source_filter or "").strip().lower()]
-        key_str = "|".join(key_parts)
-        return f"query:{hashlib.md5(key_str.encode()).hexdigest()}"
+        return _compute_query_key(query, search_mode, top_k, source_filter)
 
-    def get(
-        self,
-        query: str,
-        search_mode: str,
-        top_k: int,
-        source_filter: str | None = None,
-    ) -> dict | None:
-        """Get cached query result."""
-        key = self._make_key(query, search_mode, top_k, source_filter)
+    def get(self, key: bytes) -> bytes | None:
+        """Get cached query result as serialized JSON bytes."""
         result = self._cache.get(key)
-        if result:
-            logger.debug(f"QueryCache.get() HIT for key: {key[:50]}...")
-        else:
-            logger.debug(f"QueryCache.get() MISS for key: {key[:50]}... | Cache size: {self._cache.size}")
+        if logger.isEnabledFor(logging.DEBUG):
+            if result:
+                logger.debug(f"QueryCache.get() HIT for key: {key.hex()}")
+            else:
+                logger.debug(f"QueryCache.get() MISS for key: {key.hex()} | Cache size: {self._cache.size}")
         return result
 
-    def set(
-        self,
-        query: str,
-        search_mode: str,
-        top_k: int,
-        result: dict,
-        source_filter: str | None = None,
-    ) -> None:
-        """Cache query result."""
-        key = self._make_key(query, search_mode, top_k, source_filter)
+    def set(self, key: bytes, result: bytes) -> None:
+        """Cache query result as serialized JSON bytes."""
         self._cache.set(key, result)
-        logger.debug(f"QueryCache.set() stored key: {key[:50]}... | Cache size: {self._cache.size}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"QueryCache.set() stored key: {key.hex()} | Cache size: {self._cache.size}")
 
 
-_cache: InMemoryCache | RedisCache | None = None
+_cache: InMemoryCache | ShardedLRUCache | SharedMemoryCache | RedisCache | None = None
 _embedding_cache: EmbeddingCache | None = None
 _query_cache: QueryCache | None = None
+# Reentrant: the embedding and query cache getters build the shared backend while holding it
+_cache_lock = threading.RLock()
 
 
-def get_cache() -> InMemoryCache | RedisCache:
+def get_cache() -> InMemoryCache | ShardedLRUCache | SharedMemoryCache | RedisCache:
     """Get or create global cache instance with automatic fallback."""
     global _cache
     if _cache is None:
-        from app.config import settings
-        
-        # Try to use Redis if configured and available
-        if settings.redis_url and REDIS_AVAILABLE:
-            try:
-                _cache = RedisCache(settings.redis_url, default_ttl=3600)
-                logger.info("Using Redis cache")
-            except (ConnectionError, Exception) as e:
-                logger.warning(f"Failed to connect to Redis: {e}")
-                logger.info("Falling back to in-memory cache (Redis configured but unavailable)")
-                _cache = InMemoryCache()
-        else:
-            # Fallback for dev mode without Docker
-            logger.info("Using in-memory cache (Redis not configured or installed)")
-            _cache = InMemoryCache()
-            
+        with _cache_lock:
+            if _cache is None:
+                _cache = _create_cache()
     return _cache
 
 
+def _create_cache() -> InMemoryCache | ShardedLRUCache | SharedMemoryCache | RedisCache:
+    """Build the cache backend, preferring Redis when configured and reachable."""
+    from app.config import settings
+    
+    # Try to use Redis if configured and available
+    if settings.redis_url and REDIS_AVAILABLE:
+        try:
+            cache = RedisCache(
+                settings.redis_url,
+                default_ttl=3600,
+                max_connections=settings.redis_max_connections,
+            )
+            logger.info("Using Redis cache")
+            return cache
+        except (ConnectionError, Exception) as e:
+            logger.warning(f"Failed to connect to Redis: {e}")
+            logger.info("Falling back to in-memory cache (Redis configured but unavailable)")
+            return _local_cache(settings)
+    # Fallback for dev mode without Docker
+    logger.info("Using in-memory cache (Redis not configured or installed)")
+    return _local_cache(settings)
+
+
+def _local_cache(settings) -> ShardedLRUCache | SharedMemoryCache:
+    """In-process cache, or one shared-memory table when several workers serve the app."""
+    if settings.workers > 1:
+        try:
+            return SharedMemoryCache(
+                max_size=settings.shared_cache_slots,
+                slot_size=settings.shared_cache_slot_size,
+                # Cached embeddings are only valid for the model that produced them
+                namespace=f"{settings.embedding_model}:{settings.embedding_dimension}",
+            )
+        except OSError as e:
+            logger.warning(f"Shared memory cache unavailable, using per-worker cache: {e}")
+    return ShardedLRUCache(sweep_interval=_SWEEP_INTERVAL)
+
+
 def get_embedding_cache() -> EmbeddingCache:
     """Get or create global embedding cache instance."""
     global _embedding_cache
     if _embedding_cache is None:
-        _embedding_cache = EmbeddingCache(get_cache())
+        from app.config import settings
+
+        with _cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(get_cache(), dtype_policy=settings.embedding_cache_dtype)
     return _embedding_cache
 
 
@@ -340,5 +965,18 @@ def get_query_cache() -> QueryCache:
     """Get or create global query cache instance."""
     global _query_cache
     if _query_cache is None:
-        _query_cache = QueryCache(get_cache())
-    return _query_cache
\ No newline at end of file
+        with _cache_lock:
+            if _query_cache is None:
+                cache = get_cache()
+                # Query responses outgrow shared memory slots; keep them in a per-worker cache
+                _query_cache = QueryCache(None if isinstance(cache, SharedMemoryCache) else cache)
+    return _query_cache
+
+
+def close_caches() -> None:
+    """Release the global cache backend (stop sweepers, disconnect or unmap) at shutdown."""
+    global _cache, _embedding_cache, _query_cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = _embedding_cache = _query_cache = None
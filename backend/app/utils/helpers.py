@@ -6,6 +6,8 @@ import hashlib
 import re
 from typing import Any
 
+_WS_RE = re.compile(r"\s+")
+
 
 def generate_id(text: str, prefix: str = "") -> str:
     hash_val = hashlib.md5(text.encode()).hexdigest()[:8]
@@ -16,13 +18,8 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove extra whitespace   
-    text = re.sub(r"\s+", " ", text)
-    
-    # Strip leading/trailing whitespace
-    text = text.strip()
-    
-    return text
+    # Collapse whitespace runs and strip leading/trailing whitespace
+    return _WS_RE.sub(" ", text).strip()
 
 
 def truncate_text(text: str, max_length: int = 500, suffix: str = "...") -> str:
@@ -89,7 +89,8 @@ def ingest_data(
     embedder = get_embedder(model_name=settings.embedding_model)
     texts = [doc["text"] for doc in documents]
     
-    embeddings = embedder.embed_texts(texts, show_progress=True)
+    with embedder.bulk_indexing():
+        embeddings = embedder.embed_texts(texts, show_progress=True)
     logger.info(f"Generated embeddings: {embeddings.shape}")
 
     logger.info("\n[4/4] Indexing documents...")